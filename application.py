@@ -1,6 +1,5 @@
-import os
 import streamlit as st
-import pandas as pd
+from datetime import datetime
 
 from dotenv import load_dotenv  
 
@@ -8,6 +7,9 @@ load_dotenv()
 
 # Import core logic classes and rerun utility
 from src.utils.helpers import rerun, QuizManager
+from src.generator.registry import get_question_generator, warm_up
+from src.common.metrics import start_metrics_server
+from src.config.settings import settings
 
 # Main Streamlit app logic
 def main():
@@ -23,6 +25,13 @@ def main():
     if 'rerun_trigger' not in st.session_state:
         st.session_state.rerun_trigger = False  
 
+    # Build the shared generator in the background as soon as the app loads (once per process;
+    # this also starts the warm question pool), so the first quiz doesn't wait for it
+    warm_up()
+
+    # Expose LLM latency, token and retry metrics on /metrics (started once per process)
+    start_metrics_server()
+
     st.title("Study Buddy AI")
 
     # Sidebar input: quiz settings
@@ -44,14 +53,36 @@ def main():
         "Number of Questions", min_value=1, max_value=10, value=5
     )
 
+    # Show each question as soon as it is generated instead of waiting for the whole quiz.
+    # Streaming makes one LLM call per question, so it is off by default in batch mode to keep its token savings
+    stream_questions = st.sidebar.checkbox(
+        "Show questions as they are generated", value=settings.GENERATION_MODE != "batch"
+    )
+
     # Generate quiz button — creates questions using the QuestionGenerator
     if st.sidebar.button("Generate Quiz"):
         st.session_state.quiz_submitted = False
-        from src.generator.question_generator import QuestionGenerator
-        generator = QuestionGenerator()
-        success = st.session_state.quiz_manager.generate_questions(
-            generator, topic, question_type, difficulty, num_questions
-        )
+        # Reuse the process-wide generator (LLM client, parsers, cache and pool are built only once)
+        generator = get_question_generator()
+
+        if stream_questions:
+            # Render a preview of every question into its own placeholder while the rest are still generating
+            placeholders = [st.empty() for _ in range(num_questions)]
+            for index in range(num_questions):
+                placeholders[index].info(f"Generating question {index + 1}...")
+            for index, question in st.session_state.quiz_manager.iter_questions(
+                generator, topic, question_type, difficulty, num_questions
+            ):
+                placeholders[index].markdown(f"**Question {index + 1}: {question['question']}**")
+
+            # The interactive quiz below replaces the previews
+            for placeholder in placeholders:
+                placeholder.empty()
+            success = bool(st.session_state.quiz_manager.questions)
+        else:
+            success = st.session_state.quiz_manager.generate_questions(
+                generator, topic, question_type, difficulty, num_questions
+            )
         st.session_state.quiz_generated = success
         rerun()  # Rerun to reflect changes in UI
 
@@ -63,23 +94,23 @@ def main():
         # Submit button: evaluates answers and displays results
         if st.button("Submit Quiz"):
             st.session_state.quiz_manager.evaluate_quiz()
+            # Append the results to the results store (written in batches)
+            st.session_state.quiz_manager.save_results()
             st.session_state.quiz_submitted = True
             rerun()
 
     # After submission, show results
     if st.session_state.quiz_submitted:
         st.header("Quiz Results")
-        results_df = st.session_state.quiz_manager.generate_result_dataframe()
+        quiz_manager = st.session_state.quiz_manager
 
-        if not results_df.empty:
-            # Score summary
-            correct_count = results_df['is_correct'].sum()
-            total_questions = len(results_df)
-            score_percentage = (correct_count / total_questions) * 100
-            st.write(f"Score: {correct_count}/{total_questions} ({score_percentage:.1f}%)")
+        if quiz_manager.results:
+            # Score summary (computed once when the quiz was submitted)
+            summary = quiz_manager.summary
+            st.write(f"Score: {summary['correct']}/{summary['total']} ({summary['percentage']:.1f}%)")
 
             # Show detailed result for each question
-            for _, result in results_df.iterrows():
+            for result in quiz_manager.results:
                 question_num = result['question_number']
                 if result['is_correct']:
                     st.success(f"✅ Question {question_num}: {result['question']}")
@@ -90,17 +121,16 @@ def main():
 
                 st.markdown("---")
 
-            # Option to save and download results
+            # Option to download the results, exported from the results store on demand
             if st.button("Save Results"):
-                saved_file = st.session_state.quiz_manager.save_to_csv()
-                if saved_file:
-                    with open(saved_file, 'rb') as f:
-                        st.download_button(
-                            label="Download Results",
-                            data=f.read(),
-                            file_name=os.path.basename(saved_file),
-                            mime='text/csv'
-                        )
+                csv_data = quiz_manager.export_csv()
+                if csv_data:
+                    st.download_button(
+                        label="Download Results",
+                        data=csv_data,
+                        file_name=f"quiz_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                        mime='text/csv'
+                    )
         else:
             st.warning("No results available. Please complete the quiz first.")
 
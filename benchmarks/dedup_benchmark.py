@@ -0,0 +1,104 @@
+"""
+Overall Purpose:
+---------------
+Scale check of the near-duplicate index (`QuestionIndex`) on a synthetic question bank.
+
+It fills an index with `--items` random questions and reports:
+- time to add one question
+- p50/p99 lookup latency for new questions and for reworded duplicates
+- how many reworded duplicates were caught and how many new questions were wrongly rejected
+- memory used by the index
+
+Usage:
+    python -m benchmarks.dedup_benchmark --items 100000
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from benchmarks.generation_benchmark import percentile
+from src.generator.dedup import QuestionIndex
+
+TEMPLATES = [
+    "What is the {a} {b} of the {c} {d}?",
+    "Which {a} {b} is known for the {c} {d}?",
+    "Who introduced the {a} {b} during the {c} {d}?",
+    "In which year did the {a} {b} reach the {c} {d}?",
+]
+# Rewordings of a question that should still count as the same question
+REWORDINGS = [
+    lambda q: q.upper(),
+    lambda q: q.replace("Which", "What").replace("the", "a"),
+    lambda q: q.rstrip("?") + " exactly?",
+]
+
+
+def random_question(rng: random.Random, vocabulary: list) -> str:
+    words = rng.sample(vocabulary, 4)
+    return rng.choice(TEMPLATES).format(a=words[0], b=words[1], c=words[2], d=words[3])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Near-duplicate index scale benchmark")
+    parser.add_argument("--items", type=int, default=100000, help="Questions in the index")
+    parser.add_argument("--queries", type=int, default=2000, help="Lookups of each kind")
+    parser.add_argument("--vocabulary", type=int, default=5000, help="Distinct words in the synthetic questions")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--max-lookup-ms", type=float, default=1.0, help="Fail when p99 lookup latency is above this")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    vocabulary = [f"word{i}" for i in range(args.vocabulary)]
+    bank = [random_question(rng, vocabulary) for _ in range(args.items)]
+
+    # Memory is traced while the bank is loaded; add latency is timed separately, without tracing
+    tracemalloc.start()
+    index = QuestionIndex()
+    for text in bank:
+        index.add(text)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    extra = [random_question(rng, vocabulary) for _ in range(args.queries)]
+    start = time.perf_counter()
+    for text in extra:
+        index.add(text)
+    add_seconds = time.perf_counter() - start
+
+    def timed_lookups(texts: list):
+        latencies, found = [], 0
+        for text in texts:
+            start = time.perf_counter()
+            found += index.contains(text)
+            latencies.append(time.perf_counter() - start)
+        return latencies, found
+
+    duplicates = [rng.choice(REWORDINGS)(rng.choice(bank)) for _ in range(args.queries)]
+    fresh = [random_question(rng, vocabulary) for _ in range(args.queries)]
+    duplicate_latencies, caught = timed_lookups(duplicates)
+    fresh_latencies, false_positives = timed_lookups(fresh)
+
+    latencies = duplicate_latencies + fresh_latencies
+    report = {
+        "items": len(index),
+        "add_ms_per_item": round(add_seconds / args.queries * 1000, 4),
+        "lookup_p50_ms": round(percentile(latencies, 50) * 1000, 4),
+        "lookup_p99_ms": round(percentile(latencies, 99) * 1000, 4),
+        "duplicates_caught": round(caught / args.queries, 4),
+        "false_positive_rate": round(false_positives / args.queries, 4),
+        "index_memory_mb": round(memory / 1024 / 1024, 1),
+    }
+    print(json.dumps(report, indent=2))
+
+    if report["lookup_p99_ms"] > args.max_lookup_ms:
+        print(f"REGRESSION p99 lookup {report['lookup_p99_ms']} ms > {args.max_lookup_ms} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""
+Overall Purpose:
+---------------
+Offline benchmark of question generation, driven by the deterministic `FakeChatModel`
+instead of the Groq API (no network, no quota).
+
+For each generation mode (sequential, concurrent, batch) it reports:
+- p50/p95/p99 latency per question
+- questions per second
+- LLM calls (and retries) per question
+- time spent parsing and validating answers
+
+Results are printed as JSON (and optionally written to a file). Passing `--baseline` with a
+previous result file fails the run when throughput drops by more than `--tolerance`.
+
+Usage:
+    python -m benchmarks.generation_benchmark --questions 50 --latency-ms 200 --malformed-rate 0.1
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+
+from src.config.settings import settings
+from src.generator.question_generator import QuestionGenerator
+from src.llm.fake_llm import FakeChatModel
+from src.llm.rate_limiter import RateLimiter
+from src.utils.helpers import QuizManager
+
+MODES = ["sequential", "concurrent", "batch"]
+
+
+# QuestionGenerator that records how long each question and each parse took
+class TimedQuestionGenerator(QuestionGenerator):
+    def __init__(self, llm):
+        # Client-side limits are disabled so the benchmark measures generation, not the budget
+        super().__init__(llm=llm, rate_limiter=RateLimiter(0, 0))
+        self.question_latencies = []
+        self.parse_seconds = 0.0
+
+    def _parse_and_validate(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super()._parse_and_validate(*args, **kwargs)
+        finally:
+            self.parse_seconds += time.perf_counter() - start
+
+    def _parse_batch_items(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super()._parse_batch_items(*args, **kwargs)
+        finally:
+            self.parse_seconds += time.perf_counter() - start
+
+    def _validate_batch_item(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super()._validate_batch_item(*args, **kwargs)
+        finally:
+            self.parse_seconds += time.perf_counter() - start
+
+    def generate_mcq(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().generate_mcq(*args, **kwargs)
+        finally:
+            self.question_latencies.append(time.perf_counter() - start)
+
+    async def agenerate_mcq(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await super().agenerate_mcq(*args, **kwargs)
+        finally:
+            self.question_latencies.append(time.perf_counter() - start)
+
+    def generate_batch(self, question_type, topic, difficulty, count):
+        start = time.perf_counter()
+        try:
+            return super().generate_batch(question_type, topic, difficulty, count)
+        finally:
+            # Every question in a batch arrives when the whole batch is done
+            self.question_latencies.extend([time.perf_counter() - start] * count)
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100.0 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_mode(mode: str, args) -> dict:
+    llm = FakeChatModel(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        malformed_rate=args.malformed_rate,
+        unfixable_rate=args.unfixable_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed,
+    )
+    generator = TimedQuestionGenerator(llm)
+    manager = QuizManager()
+
+    # Generate the requested number of questions through QuizManager, as quizzes of `--quiz-size`
+    generated = 0
+    first_calls = 0  # LLM calls that were not retries
+    start = time.perf_counter()
+    remaining = args.questions
+    while remaining > 0:
+        size = min(args.quiz_size, remaining)
+        manager.generate_questions(generator, args.topic, "Multiple Choice", "Medium", size, mode)
+        generated += len(manager.questions)
+        first_calls += math.ceil(size / max(1, settings.MAX_BATCH_SIZE)) if mode == "batch" else size
+        remaining -= size
+    elapsed = time.perf_counter() - start
+
+    latencies = generator.question_latencies
+    return {
+        "mode": mode,
+        "questions": generated,
+        "failed": args.questions - generated,
+        "seconds": round(elapsed, 4),
+        "questions_per_second": round(generated / elapsed, 3) if elapsed else 0.0,
+        "latency_p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "latency_p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "latency_p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "llm_calls": llm.calls,
+        "llm_calls_per_question": round(llm.calls / generated, 3) if generated else None,
+        "retries_per_question": round((llm.calls - first_calls) / generated, 3) if generated else None,
+        "rate_limited_calls": llm.rate_limited,
+        "parse_ms_total": round(generator.parse_seconds * 1000, 2),
+    }
+
+
+# Compare against a previous result file; return a list of regressions
+def compare(results: list, baseline_path: str, tolerance: float) -> list:
+    with open(baseline_path) as f:
+        baseline = {r["mode"]: r for r in json.load(f)["results"]}
+
+    regressions = []
+    for result in results:
+        previous = baseline.get(result["mode"])
+        if not previous or not previous["questions_per_second"]:
+            continue
+        floor = previous["questions_per_second"] * (1 - tolerance)
+        if result["questions_per_second"] < floor:
+            regressions.append(
+                f"{result['mode']}: {result['questions_per_second']} q/s < {floor:.3f} q/s "
+                f"(baseline {previous['questions_per_second']})"
+            )
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline question generation benchmark")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--questions", type=int, default=30, help="Total questions per mode")
+    parser.add_argument("--quiz-size", type=int, default=10, help="Questions per quiz request")
+    parser.add_argument("--topic", default="Geography")
+    parser.add_argument("--concurrency", type=int, default=settings.MAX_CONCURRENCY)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Median fake LLM latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.3, help="Log-normal latency spread")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Share of repairable answers")
+    parser.add_argument("--unfixable-rate", type=float, default=0.0, help="Share of answers needing a re-prompt")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of calls rejected with 429")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    parser.add_argument("--baseline", help="Previous results file to check for throughput regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed throughput drop vs. baseline")
+    args = parser.parse_args(argv)
+
+    settings.MAX_CONCURRENCY = args.concurrency
+    results = [run_mode(mode, args) for mode in args.modes]
+    report = {"config": vars(args), "results": results}
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
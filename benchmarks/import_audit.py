@@ -0,0 +1,81 @@
+"""
+Overall Purpose:
+---------------
+Import-time audit of the app, based on `python -X importtime`.
+
+It imports a module (the Streamlit entry point `application` by default) in a fresh
+interpreter and reports:
+- the total import time of that module
+- the slowest modules by cumulative import time
+- the import time per top-level package (e.g. streamlit, langchain, pandas)
+
+Usage:
+    python -m benchmarks.import_audit [--module application] [--top 25]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# Import `module` in a fresh interpreter; returns [(module name, self us, cumulative us, depth)]
+def run_importtime(module: str = "application", python: str = None) -> list:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (REPO_ROOT, env.get("PYTHONPATH")) if p)
+    completed = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr[-2000:]}")
+
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def audit(module: str = "application", top: int = 25) -> dict:
+    entries = run_importtime(module)
+    total_us = next((cumulative for name, _, cumulative, _ in entries if name == module), 0)
+
+    packages = {}
+    for name, self_us, _, _ in entries:
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_us
+
+    slowest = sorted(entries, key=lambda e: e[2], reverse=True)[:top]
+    return {
+        "module": module,
+        "total_ms": round(total_us / 1000, 2),
+        "modules_imported": len(entries),
+        "slowest": [{"module": name, "cumulative_ms": round(cumulative / 1000, 2), "self_ms": round(self_us / 1000, 2)}
+                    for name, self_us, cumulative, _ in slowest],
+        "packages": [{"package": name, "ms": round(us / 1000, 2)}
+                     for name, us in sorted(packages.items(), key=lambda p: p[1], reverse=True)[:top]],
+        "loaded": sorted({name for name, _, _, _ in entries}),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Import-time audit (python -X importtime)")
+    parser.add_argument("--module", default="application", help="Module to import")
+    parser.add_argument("--top", type=int, default=25, help="Number of modules and packages to list")
+    args = parser.parse_args(argv)
+
+    report = audit(args.module, args.top)
+    report.pop("loaded")
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,316 @@
+"""
+Overall Purpose:
+---------------
+Load test of one app process (one pod): many simulated users go through the quiz flow
+generate -> answer -> submit -> save -> export, driving `QuizManager` directly with the
+generator stack from the registry and the LLM replaced by the offline fake model.
+
+Here's what's happening:
+- Each simulated user runs in its own thread (like a Streamlit session) and starts a new quiz
+  as soon as the previous one is saved, with an optional think time while answering.
+- LLM calls go through the client-side rate limiter with the pod's limits (`--rate-limit-rpm`
+  / `--rate-limit-tpm`, the configured RATE_LIMIT_* by default), since that, not CPU, usually
+  caps how many quizzes a pod can serve.
+- The run steps through rising concurrency levels; for each level it reports sessions per
+  second, p50/p95/p99 latency of every step, failed sessions, LLM calls and tokens per session,
+  CPU used (cores) and the process memory (RSS, and Python allocations with `--tracemalloc`)
+  before and after the level.
+- From the highest level that still meets `--target-p95-ms` without failures it recommends
+  the replica count for `--peak-sessions-per-second`, the per-replica rate limits that keep all
+  replicas together within the account quota (`--account-rpm` / `--account-tpm`), and the
+  pod's CPU and memory requests and limits. A peak the account quota cannot serve is flagged.
+
+The Streamlit server itself (websockets, widget state, ~100-150 MB RSS) is not part of the
+measurement; add `--server-overhead-mb` to account for it in the memory recommendation.
+
+Usage:
+    python -m benchmarks.load_benchmark --concurrency 1 5 10 25 50 --duration 20 --latency-ms 800
+    python -m benchmarks.load_benchmark --peak-sessions-per-second 0.1 --rate-limit-rpm 15 --rate-limit-tpm 3000
+    python -m benchmarks.load_benchmark --rate-limit-rpm 0 --rate-limit-tpm 0   # CPU/memory capacity only
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from benchmarks.generation_benchmark import percentile
+from src.config.settings import settings
+
+STEPS = ["generate", "answer", "submit", "save", "export"]
+QUESTION_TYPES = ["Multiple Choice", "Fill in the Blank"]
+
+
+# Current resident set size of this process in MB (peak RSS where /proc is not available)
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+# Point the app at the fake LLM and a throwaway results store before anything is built
+def configure(args, workdir: str):
+    settings.LLM_PROVIDER = "fake"
+    settings.LLM_BACKENDS = []
+    settings.FAKE_LLM_LATENCY_MS = args.latency_ms
+    settings.RATE_LIMIT_REQUESTS_PER_MINUTE = args.rate_limit_rpm
+    settings.RATE_LIMIT_TOKENS_PER_MINUTE = args.rate_limit_tpm
+    settings.GENERATION_MODE = args.mode
+    settings.QUESTION_CACHE_ENABLED = args.question_cache
+    settings.QUESTION_CACHE_PATH = os.path.join(workdir, "question_cache.db")
+    settings.QUESTION_POOL_ENABLED = args.question_pool
+    settings.COALESCE_ENABLED = args.coalesce
+    settings.RESULTS_STORE_PATH = os.path.join(workdir, "results.db")
+    settings.WARMUP_ON_START = False
+
+
+# LLM calls made and tokens used so far (as reported by the model)
+def llm_usage() -> tuple:
+    from src.generator.question_generator import LLM_TOKENS
+    from src.llm.groq_client import get_groq_llm
+
+    kinds = ["MCQQuestion", "FillBlankQuestion", "MCQBatch", "FillBlankBatch"]
+    tokens = sum(LLM_TOKENS.value(kind=kind, direction=direction) for kind in kinds for direction in ("prompt", "completion"))
+    return get_groq_llm().calls, tokens
+
+
+# One user session: generate a quiz, answer it, submit, save and export the results
+def run_session(generator, rng: random.Random, args) -> dict:
+    from src.utils.helpers import QuizManager
+
+    manager = QuizManager()
+    timings = {}
+
+    start = time.perf_counter()
+    ok = manager.generate_questions(generator, rng.choice(args.topics), rng.choice(QUESTION_TYPES),
+                                    rng.choice(["Easy", "Medium", "Hard"]), args.questions)
+    timings["generate"] = time.perf_counter() - start
+    if not ok:
+        return {"timings": timings, "ok": False}
+
+    start = time.perf_counter()
+    if args.think_ms:
+        time.sleep(rng.uniform(0.5, 1.5) * args.think_ms / 1000.0)
+    for i, question in enumerate(manager.questions):
+        if question["type"] == "MCQ":
+            manager.user_answers[i] = rng.choice(question["options"])
+        else:
+            manager.user_answers[i] = question["correct_answer"] if rng.random() < 0.5 else "no idea"
+    timings["answer"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    manager.evaluate_quiz()
+    timings["submit"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    saved = manager.save_results() is not None
+    timings["save"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    exported = manager.export_csv() is not None
+    timings["export"] = time.perf_counter() - start
+
+    return {"timings": timings, "ok": saved and exported}
+
+
+def run_level(generator, users: int, args) -> dict:
+    deadline = time.monotonic() + args.duration
+    sessions = []
+    errors = []
+    lock = threading.Lock()
+
+    def user(number: int):
+        rng = random.Random(args.seed * 1000 + number)
+        while time.monotonic() < deadline:
+            try:
+                outcome = run_session(generator, rng, args)
+            except Exception as e:
+                with lock:
+                    errors.append(repr(e))
+                continue
+            with lock:
+                sessions.append(outcome)
+
+    rss_before = rss_mb()
+    calls_before, tokens_before = llm_usage()
+    traced_before = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+    cpu_before = time.process_time()
+    start = time.perf_counter()
+
+    threads = [threading.Thread(target=user, args=(n,), name=f"load-user-{n}") for n in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    elapsed = time.perf_counter() - start
+    completed = [s for s in sessions if s["ok"]]
+    calls, tokens = llm_usage()
+    result = {
+        "users": users,
+        "seconds": round(elapsed, 2),
+        "sessions": len(completed),
+        "failed_sessions": len(sessions) - len(completed) + len(errors),
+        "sessions_per_second": round(len(completed) / elapsed, 3) if elapsed else 0.0,
+        "llm_calls_per_session": round((calls - calls_before) / len(sessions), 2) if sessions else None,
+        "llm_tokens_per_session": round((tokens - tokens_before) / len(sessions), 1) if sessions else None,
+        "steps": {},
+        "cpu_cores": round((time.process_time() - cpu_before) / elapsed, 3) if elapsed else 0.0,
+        "rss_mb_before": round(rss_before, 1),
+        "rss_mb_after": round(rss_mb(), 1),
+    }
+    result["rss_mb_growth"] = round(result["rss_mb_after"] - result["rss_mb_before"], 1)
+    if traced_before is not None:
+        traced, peak = tracemalloc.get_traced_memory()
+        result["python_alloc_mb_growth"] = round((traced - traced_before) / 2**20, 2)
+        result["python_alloc_mb_peak"] = round(peak / 2**20, 2)
+        tracemalloc.reset_peak()
+    if errors:
+        result["errors"] = sorted(set(errors))[:5]
+
+    for step in STEPS:
+        values = [s["timings"][step] for s in sessions if step in s["timings"]]
+        result["steps"][step] = {
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+        }
+    return result
+
+
+# Replica count and pod resources from the highest level that met the latency target
+def recommend(levels: list, args) -> dict:
+    healthy = [
+        level for level in levels
+        if level["failed_sessions"] == 0 and level["sessions"]
+        and level["steps"]["generate"]["p95_ms"] <= args.target_p95_ms
+    ]
+    if not healthy:
+        return {"note": f"No level met p95 generate <= {args.target_p95_ms} ms without failures; "
+                        f"try lower --concurrency levels (or, if the rate limiter is the bottleneck, "
+                        f"a longer --duration, more replicas or the question cache / pool)"}
+
+    best = max(healthy, key=lambda level: level["sessions_per_second"])
+    calls, tokens = best["llm_calls_per_session"], best["llm_tokens_per_session"]
+
+    # Sessions per second a budget of requests/tokens per minute allows (None: unlimited)
+    def budget(rpm: float, tpm: float):
+        caps = [rpm / 60 / calls] if rpm and calls else []
+        caps += [tpm / 60 / tokens] if tpm and tokens else []
+        return min(caps) if caps else None
+
+    # The pod's own rate limiter bounds it even if the measurement ran faster (e.g. a short level
+    # served from the limiter's initial burst)
+    pod_limit = budget(args.rate_limit_rpm, args.rate_limit_tpm)
+    per_pod = min(best["sessions_per_second"], pod_limit or math.inf) * (1 - args.headroom)
+    replicas = max(2, math.ceil(args.peak_sessions_per_second / per_pod)) if per_pod else None
+
+    # All replicas share the account quota, so more replicas cannot serve more than it allows
+    quota_limit = budget(args.account_rpm, args.account_tpm)
+    warnings = []
+    if quota_limit is not None and args.peak_sessions_per_second > quota_limit:
+        warnings.append(f"The peak of {args.peak_sessions_per_second} sessions/s needs more than the account quota "
+                        f"allows ({quota_limit:.3f} sessions/s at {calls} LLM calls per session); raise the quota "
+                        f"or serve more questions from the question cache / pool")
+    if replicas and pod_limit is not None and quota_limit is not None and pod_limit * replicas > quota_limit * 1.001:
+        warnings.append(f"{replicas} replicas x the tested per-pod rate limits exceed the account quota; "
+                        f"use the per-replica limits below")
+
+    peak_rss = max(level["rss_mb_after"] for level in levels if level["users"] <= best["users"])
+    memory_request = math.ceil((peak_rss + args.server_overhead_mb) * 1.25 / 64) * 64
+    cpu_request = max(100, math.ceil(best["cpu_cores"] * 1000 * 1.25 / 50) * 50)
+    return {
+        "sustainable_users_per_pod": best["users"],
+        "sustainable_sessions_per_second_per_pod": round(per_pod, 3),
+        "replicas": replicas,
+        "rate_limit_per_pod_sessions_per_second": round(pod_limit, 3) if pod_limit is not None else None,
+        "account_quota_sessions_per_second": round(quota_limit, 3) if quota_limit is not None else None,
+        # Env for each replica so that all of them together stay within the account quota
+        "rate_limits_per_replica": {
+            "RATE_LIMIT_REQUESTS_PER_MINUTE": args.account_rpm // replicas if replicas else None,
+            "RATE_LIMIT_TOKENS_PER_MINUTE": args.account_tpm // replicas if replicas else None,
+        },
+        "warnings": warnings,
+        "resources": {
+            "requests": {"cpu": f"{cpu_request}m", "memory": f"{memory_request}Mi"},
+            "limits": {"cpu": f"{cpu_request * 2}m", "memory": f"{memory_request * 2}Mi"},
+        },
+        "note": (f"{args.headroom:.0%} headroom per pod and a minimum of 2 replicas; memory includes "
+                 f"{args.server_overhead_mb} MB for the Streamlit server"),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load test of the quiz flow with a fake LLM")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 5, 10, 25, 50], help="Simulated users per level")
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds per concurrency level")
+    parser.add_argument("--questions", type=int, default=5, help="Questions per quiz")
+    parser.add_argument("--topics", nargs="+", default=["Geography", "History", "Physics", "Biology", "Literature"])
+    parser.add_argument("--mode", choices=["sequential", "concurrent", "batch"], default=settings.GENERATION_MODE)
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="Median fake LLM latency")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Mean time a user spends answering")
+    parser.add_argument("--question-cache", action="store_true", help="Serve repeated topics from the question cache")
+    parser.add_argument("--question-pool", action="store_true", help="Enable the warm question pool")
+    parser.add_argument("--rate-limit-rpm", type=int, default=settings.RATE_LIMIT_REQUESTS_PER_MINUTE,
+                        help="LLM requests per minute allowed per pod (0: no limit)")
+    parser.add_argument("--rate-limit-tpm", type=int, default=settings.RATE_LIMIT_TOKENS_PER_MINUTE,
+                        help="LLM tokens per minute allowed per pod (0: no limit)")
+    parser.add_argument("--account-rpm", type=int, default=settings.RATE_LIMIT_REQUESTS_PER_MINUTE,
+                        help="Requests per minute of the Groq account, shared by all replicas")
+    parser.add_argument("--account-tpm", type=int, default=settings.RATE_LIMIT_TOKENS_PER_MINUTE,
+                        help="Tokens per minute of the Groq account, shared by all replicas")
+    parser.add_argument("--no-coalesce", dest="coalesce", action="store_false", help="Disable request coalescing")
+    parser.add_argument("--tracemalloc", action="store_true", help="Also track Python allocations (slower)")
+    parser.add_argument("--peak-sessions-per-second", type=float, default=1.0, help="Expected peak load of the whole app")
+    parser.add_argument("--target-p95-ms", type=float, default=10000.0, help="Acceptable p95 latency of quiz generation")
+    parser.add_argument("--headroom", type=float, default=0.3, help="Share of a pod's capacity kept free")
+    parser.add_argument("--server-overhead-mb", type=float, default=150.0, help="Memory of the Streamlit server itself")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="quiz-load-") as workdir:
+        configure(args, workdir)
+        if args.tracemalloc:
+            tracemalloc.start()
+
+        from src.generator.registry import get_question_generator
+        from src.storage.results_store import get_results_store
+
+        rss_start = rss_mb()
+        generator = get_question_generator()
+        levels = []
+        for users in args.concurrency:
+            levels.append(run_level(generator, users, args))
+            print(f"{users} users: {levels[-1]['sessions_per_second']} sessions/s, "
+                  f"p95 generate {levels[-1]['steps']['generate']['p95_ms']} ms, "
+                  f"RSS {levels[-1]['rss_mb_after']} MB", file=sys.stderr)
+        get_results_store().flush()
+
+        report = {
+            "config": vars(args),
+            "rss_mb_start": round(rss_start, 1),
+            "levels": levels,
+            "recommendation": recommend(levels, args),
+        }
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
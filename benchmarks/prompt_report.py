@@ -0,0 +1,178 @@
+"""
+Overall Purpose:
+---------------
+Prompt efficiency report: compares the prompt variants of `src.prompts.templates` (with and
+without JSON mode) on the same set of questions.
+
+For each variant it reports:
+- the estimated size of every rendered prompt (single question and batch)
+- LLM calls, prompt and completion tokens (as reported by the model)
+- tokens per valid question
+- validation failure rate: share of answers (single responses or batch items) that were
+  invalid even after the local repair stage
+
+With the default fake model, answer quality does not depend on the prompt, so only the token
+figures and the effect of JSON mode are meaningful; run with `--provider groq` (needs
+GROQ_API_KEY and spends quota) to compare validation failure rates of the real model.
+
+Usage:
+    python -m benchmarks.prompt_report --questions 20 --malformed-rate 0.1 --unfixable-rate 0.05
+    python -m benchmarks.prompt_report --provider groq --questions 10 --modes batch
+"""
+
+import argparse
+import json
+import sys
+
+from src.config.settings import settings
+from src.generator.question_generator import QuestionGenerator, QUESTION_TYPE_MCQ, QUESTION_TYPE_FILL_BLANK, _token_usage
+from src.llm.fake_llm import FakeChatModel
+from src.llm.rate_limiter import RateLimiter, get_rate_limiter
+from src.prompts.templates import PROMPT_VARIANTS
+from src.prompts.token_counter import count_prompt_tokens
+
+QUESTION_TYPES = [QUESTION_TYPE_MCQ, QUESTION_TYPE_FILL_BLANK]
+MODES = ["sequential", "batch"]
+
+
+# Chat model wrapper that adds up calls and reported token usage
+class UsageRecorder:
+    def __init__(self, llm):
+        self.llm = llm
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def _record(self, response):
+        prompt_tokens, completion_tokens = _token_usage(response)
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        return response
+
+    def invoke(self, prompt, **kwargs):
+        return self._record(self.llm.invoke(prompt, **kwargs))
+
+    async def ainvoke(self, prompt, **kwargs):
+        return self._record(await self.llm.ainvoke(prompt, **kwargs))
+
+
+# QuestionGenerator that counts answers and the ones failing validation
+class CountingQuestionGenerator(QuestionGenerator):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.answers = 0
+        self.invalid = 0
+
+    def _count(self, check, *args, **kwargs):
+        self.answers += 1
+        try:
+            return check(*args, **kwargs)
+        except Exception:
+            self.invalid += 1
+            raise
+
+    def _parse_and_validate(self, *args, **kwargs):
+        return self._count(super()._parse_and_validate, *args, **kwargs)
+
+    def _validate_batch_item(self, *args, **kwargs):
+        return self._count(super()._validate_batch_item, *args, **kwargs)
+
+    def _parse_batch_items(self, *args, **kwargs):
+        try:
+            return super()._parse_batch_items(*args, **kwargs)
+        except Exception:
+            # The whole batch was unusable: one invalid answer
+            self.answers += 1
+            self.invalid += 1
+            raise
+
+
+def make_llm(args):
+    if args.provider == "groq":
+        from src.llm.groq_client import create_llm
+        return create_llm("groq", args.model, settings.TEMPERATURE)
+    return FakeChatModel(latency_ms=args.latency_ms, malformed_rate=args.malformed_rate,
+                         unfixable_rate=args.unfixable_rate, seed=args.seed)
+
+
+# Estimated tokens of every rendered prompt of a variant
+def prompt_sizes(variant: str, topic: str, batch_size: int) -> dict:
+    prompts = PROMPT_VARIANTS[variant]
+    templates = {
+        "mcq": (prompts.mcq, {}),
+        "fill_blank": (prompts.fill_blank, {}),
+        "mcq_batch": (prompts.mcq_batch, {"count": batch_size}),
+        "fill_blank_batch": (prompts.fill_blank_batch, {"count": batch_size}),
+    }
+    return {
+        name: count_prompt_tokens(prompts.render(template, topic=topic, difficulty="medium", **extra))
+        for name, (template, extra) in templates.items()
+    }
+
+
+def run_variant(variant: str, json_mode: bool, mode: str, args) -> dict:
+    llm = UsageRecorder(make_llm(args))
+    # The fake model needs no client-side limits; the real one keeps the configured budget
+    rate_limiter = RateLimiter(0, 0) if args.provider == "fake" else get_rate_limiter()
+    generator = CountingQuestionGenerator(llm=llm, rate_limiter=rate_limiter, prompt_variant=variant, json_mode=json_mode)
+
+    requested = valid = 0
+    for question_type in QUESTION_TYPES:
+        generated = generator.generate_questions(question_type, args.topic, "medium", args.questions, mode)
+        requested += len(generated)
+        valid += sum(1 for q in generated if not isinstance(q, Exception))
+
+    tokens = llm.prompt_tokens + llm.completion_tokens
+    return {
+        "variant": variant,
+        "json_mode": json_mode,
+        "mode": mode,
+        "questions": requested,
+        "valid_questions": valid,
+        "llm_calls": llm.calls,
+        "prompt_tokens": llm.prompt_tokens,
+        "completion_tokens": llm.completion_tokens,
+        "prompt_tokens_per_call": round(llm.prompt_tokens / llm.calls, 1) if llm.calls else None,
+        "tokens_per_valid_question": round(tokens / valid, 1) if valid else None,
+        "prompt_tokens_per_valid_question": round(llm.prompt_tokens / valid, 1) if valid else None,
+        "validation_failure_rate": round(generator.invalid / generator.answers, 3) if generator.answers else None,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Prompt variant token and validation report")
+    parser.add_argument("--variants", nargs="+", choices=list(PROMPT_VARIANTS), default=list(PROMPT_VARIANTS))
+    parser.add_argument("--json-mode", choices=["off", "on", "both"], default="both", help="Run with JSON mode off, on or both")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--questions", type=int, default=20, help="Questions per question type")
+    parser.add_argument("--topic", default="Geography")
+    parser.add_argument("--provider", choices=["fake", "groq"], default="fake")
+    parser.add_argument("--model", default=settings.MODEL_NAME, help="Groq model (with --provider groq)")
+    parser.add_argument("--latency-ms", type=float, default=10.0, help="Median fake LLM latency")
+    parser.add_argument("--malformed-rate", type=float, default=0.1, help="Share of repairable fake answers")
+    parser.add_argument("--unfixable-rate", type=float, default=0.05, help="Share of fake answers needing a re-prompt")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args(argv)
+
+    json_modes = {"off": [False], "on": [True], "both": [False, True]}[args.json_mode]
+    report = {
+        "config": vars(args),
+        "prompt_sizes": {v: prompt_sizes(v, args.topic, settings.MAX_BATCH_SIZE) for v in args.variants},
+        "results": [
+            run_variant(variant, json_mode, mode, args)
+            for variant in args.variants for json_mode in json_modes for mode in args.modes
+        ],
+    }
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Overall Purpose:
+---------------
+Offline check of the model router (`src.llm.router`) with fake backends: a backend with a
+long latency tail, a fast but flaky one (rate-limit errors) and one that is down.
+
+For each scenario (one backend only, router without hedging, router with hedging) it reports
+p50/p95/p99 latency, failed requests, hedged requests and the router's view of each backend
+(rolling latency, error rate, circuit state).
+
+Usage:
+    python -m benchmarks.router_benchmark --requests 300 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.generation_benchmark import percentile
+from src.llm.fake_llm import FakeChatModel
+from src.llm.rate_limiter import RateLimiter
+from src.llm.router import Backend, ModelRouter, ROUTER_HEDGES
+
+PROMPT = "Generate a medium multiple-choice question about Geography.\n"
+
+
+def make_backends(args) -> list:
+    return [
+        Backend("tail", FakeChatModel(latency_ms=args.latency_ms, latency_sigma=0.9, seed=args.seed)),
+        Backend("flaky", FakeChatModel(latency_ms=args.latency_ms * 0.8, latency_sigma=0.2,
+                                       rate_limit_rate=args.flaky_error_rate, seed=args.seed + 1)),
+        Backend("down", FakeChatModel(latency_ms=args.latency_ms, rate_limit_rate=1.0, seed=args.seed + 2)),
+    ]
+
+
+def hedge_count(router: ModelRouter) -> float:
+    return sum(ROUTER_HEDGES.value(backend=b.name) for b in router.backends)
+
+
+def run_scenario(name: str, router: ModelRouter, args) -> dict:
+    def one_request():
+        start = time.perf_counter()
+        try:
+            router.invoke(PROMPT)
+            return time.perf_counter() - start, None
+        except Exception as e:
+            return time.perf_counter() - start, e
+
+    async def run_async():
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    await router.ainvoke(PROMPT)
+                    return time.perf_counter() - start, None
+                except Exception as e:
+                    return time.perf_counter() - start, e
+
+        return await asyncio.gather(*(one() for _ in range(args.requests)))
+
+    hedges_before = hedge_count(router)
+    start = time.perf_counter()
+    if args.use_async:
+        outcomes = asyncio.run(run_async())
+    else:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            outcomes = list(pool.map(lambda _: one_request(), range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for latency, error in outcomes if error is None]
+    return {
+        "scenario": name,
+        "requests": args.requests,
+        "failed": sum(1 for _, error in outcomes if error is not None),
+        "hedged": int(hedge_count(router) - hedges_before),
+        "seconds": round(elapsed, 3),
+        "latency_p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "latency_p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "latency_p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "backends": router.stats(),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Model router benchmark with fake backends")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Median latency of the fake backends")
+    parser.add_argument("--flaky-error-rate", type=float, default=0.1, help="Share of calls the flaky backend rejects")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Use ainvoke instead of invoke")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    # Short cooldown and early hedging so the run shows circuits reopening and hedges firing
+    # No client-side rate limit, so hedges and failovers are never held back by the budget
+    options = {"rate_limiter": RateLimiter(0, 0), "cooldown_seconds": 2.0, "min_samples": 5, "hedge_default_delay": args.latency_ms / 1000 * 3}
+    results = [
+        run_scenario("single backend", ModelRouter(make_backends(args)[:1], hedge=False, **options), args),
+        run_scenario("router", ModelRouter(make_backends(args), hedge=False, **options), args),
+        run_scenario("router + hedging", ModelRouter(make_backends(args), hedge=True, **options), args),
+    ]
+    print(json.dumps({"config": vars(args), "results": results}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Overall Purpose:
+---------------
+Cold-start benchmark of the app: how long importing the Streamlit entry point takes in a
+fresh interpreter, and whether heavy modules sneak back onto the import path.
+
+The run fails (exit code 1) when:
+- the median import time is above `--max-import-ms`, or more than `--tolerance` slower than
+  a previous result passed with `--baseline`
+- a module from `--forbidden` (langchain, pandas, ...) is loaded at import time; those must
+  only load when first needed (e.g. by the generator warm-up)
+
+Usage:
+    python -m benchmarks.startup_benchmark --runs 5 --output startup.json
+    python -m benchmarks.startup_benchmark --baseline startup.json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+
+from benchmarks.import_audit import audit
+
+# Packages that must not be imported just by loading the app
+FORBIDDEN = ["pandas", "langchain", "langchain_core", "langchain_groq", "groq", "httpx", "sqlite3", "http.server"]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Cold-start import benchmark")
+    parser.add_argument("--module", default="application", help="Module to import")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to measure (the median is used)")
+    parser.add_argument("--forbidden", nargs="*", default=FORBIDDEN, help="Modules that must not load at import time")
+    parser.add_argument("--max-import-ms", type=float, help="Fail when the median import time is above this")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    parser.add_argument("--baseline", help="Previous results file to check for import time regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed import time increase vs. baseline")
+    args = parser.parse_args(argv)
+
+    reports = [audit(args.module) for _ in range(max(1, args.runs))]
+    loaded = set(reports[-1]["loaded"])
+    report = {
+        "module": args.module,
+        "runs": len(reports),
+        "import_ms_median": round(statistics.median(r["total_ms"] for r in reports), 2),
+        "import_ms_min": min(r["total_ms"] for r in reports),
+        "modules_imported": reports[-1]["modules_imported"],
+        "forbidden_loaded": sorted(m for m in args.forbidden if m in loaded),
+        "slowest": reports[-1]["slowest"][:10],
+    }
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+
+    failures = []
+    if report["forbidden_loaded"]:
+        failures.append(f"loaded at import time: {', '.join(report['forbidden_loaded'])}")
+    if args.max_import_ms is not None and report["import_ms_median"] > args.max_import_ms:
+        failures.append(f"import {report['import_ms_median']} ms > {args.max_import_ms} ms")
+    if args.baseline:
+        with open(args.baseline) as f:
+            previous = json.load(f)["import_ms_median"]
+        ceiling = previous * (1 + args.tolerance)
+        if report["import_ms_median"] > ceiling:
+            failures.append(f"import {report['import_ms_median']} ms > {ceiling:.2f} ms (baseline {previous} ms)")
+
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""
+Overall Purpose:
+---------------
+This module defines the `QuestionCache` class, a local SQLite store of validated quiz questions.
+
+Here's what's happening:
+- Questions are stored under a key made of the normalized topic, difficulty, question type,
+  model name (or the routed backend list) and a hash of the prompt templates, so changing the model or a prompt never
+  serves questions produced by the old one.
+- Entries expire after a TTL, and the least recently used entries are evicted once the
+  cache grows past its size limit.
+- Quizzes are served by sampling cached questions without repeats.
+- Hit and miss counters show how many questions were served without calling the LLM.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from src.config.settings import settings
+from src.models.question_schemas import MCQQuestion, FillBlankQuestion
+from src.prompts.templates import get_prompt_set
+from src.common.logger import get_logger
+from src.common.metrics import counter
+
+CACHE_QUESTIONS = counter("quiz_question_cache_questions_total", "Questions requested from the question cache", ["result"])
+
+# Question schema used for each question type (keys match the UI labels)
+QUESTION_SCHEMAS = {
+    "Multiple Choice": MCQQuestion,
+    "Fill in the Blank": FillBlankQuestion,
+}
+
+
+# Hash of the prompt templates (and system message) of the configured prompt variant for a question type,
+# so editing a prompt or switching variants invalidates its cached questions
+def prompt_version(question_type: str) -> str:
+    prompts = get_prompt_set()
+    parts = [template.template for template in prompts.templates(question_type)]
+    if prompts.system:
+        parts.insert(0, prompts.system)
+    text = "\n".join(parts)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+# Build the cache key for one (topic, difficulty, question type) combination
+def make_cache_key(question_type: str, topic: str, difficulty: str) -> str:
+    normalized_topic = " ".join(topic.lower().split())
+    return "|".join([
+        normalized_topic,
+        difficulty.strip().lower(),
+        question_type,
+        # With LLM_BACKENDS the router picks among those models, so they all belong to the key
+        ",".join(settings.LLM_BACKENDS) or settings.MODEL_NAME,
+        prompt_version(question_type),
+    ])
+
+
+class QuestionCache:
+    def __init__(self, path: str = None, ttl_seconds: int = None, max_entries: int = None):
+        self.path = path or settings.QUESTION_CACHE_PATH
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.QUESTION_CACHE_TTL_SECONDS
+        self.max_entries = max_entries if max_entries is not None else settings.QUESTION_CACHE_MAX_ENTRIES
+        self.logger = get_logger(self.__class__.__name__)
+
+        # Number of questions served from the cache (hits) and requested but not cached (misses)
+        self.hits = 0
+        self.misses = 0
+
+        # One shared connection guarded by a lock, so the cache can be used from several Streamlit sessions
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS questions ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " cache_key TEXT NOT NULL,"
+            " question_text TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_access REAL NOT NULL,"
+            " UNIQUE (cache_key, question_text))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_questions_key ON questions (cache_key, created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_questions_access ON questions (last_access)")
+        self._conn.commit()
+
+    # Return up to `count` random cached questions for the key, never the same question twice
+    def get(self, question_type: str, topic: str, difficulty: str, count: int) -> list:
+        key = make_cache_key(question_type, topic, difficulty)
+        now = time.time()
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, payload FROM questions WHERE cache_key = ? AND created_at >= ? ORDER BY RANDOM() LIMIT ?",
+                (key, now - self.ttl_seconds, count),
+            ).fetchall()
+            if rows:
+                # Mark the served questions as recently used for LRU eviction
+                self._conn.executemany(
+                    "UPDATE questions SET last_access = ? WHERE id = ?",
+                    [(now, row_id) for row_id, _ in rows],
+                )
+                self._conn.commit()
+
+            self.hits += len(rows)
+            self.misses += count - len(rows)
+        CACHE_QUESTIONS.inc(len(rows), result="hit")
+        CACHE_QUESTIONS.inc(count - len(rows), result="miss")
+
+        schema = QUESTION_SCHEMAS[question_type]
+        return [schema.parse_obj(json.loads(payload)) for _, payload in rows]
+
+    # Every unexpired cached question for the key (without touching the LRU order), e.g. to seed a dedup index
+    def questions(self, question_type: str, topic: str, difficulty: str) -> list:
+        key = make_cache_key(question_type, topic, difficulty)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload FROM questions WHERE cache_key = ? AND created_at >= ?",
+                (key, time.time() - self.ttl_seconds),
+            ).fetchall()
+
+        schema = QUESTION_SCHEMAS[question_type]
+        return [schema.parse_obj(json.loads(payload)) for (payload,) in rows]
+
+    # Store validated questions for the key; questions that are already cached are ignored
+    def put(self, question_type: str, topic: str, difficulty: str, questions: list):
+        if not questions:
+            return
+        key = make_cache_key(question_type, topic, difficulty)
+        now = time.time()
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO questions (cache_key, question_text, payload, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(key, q.question, json.dumps(q.dict()), now, now) for q in questions],
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    # Drop expired questions, then the least recently used ones above `max_entries`
+    def _evict(self, now: float):
+        self._conn.execute("DELETE FROM questions WHERE created_at < ?", (now - self.ttl_seconds,))
+        (total,) = self._conn.execute("SELECT COUNT(*) FROM questions").fetchone()
+        excess = total - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM questions WHERE id IN (SELECT id FROM questions ORDER BY last_access ASC LIMIT ?)",
+                (excess,),
+            )
+            self.logger.info(f"Evicted {excess} least recently used questions from the cache")
+
+    # Number of questions currently stored
+    def size(self) -> int:
+        with self._lock:
+            (total,) = self._conn.execute("SELECT COUNT(*) FROM questions").fetchone()
+        return total
+
+    # Hit/miss counters for monitoring how much LLM work the cache saves
+    def stats(self) -> dict:
+        requested = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requested if requested else 0.0,
+            "size": self.size(),
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Process-wide cache instance shared by every quiz session
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_question_cache() -> QuestionCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = QuestionCache()
+        return _cache
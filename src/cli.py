@@ -0,0 +1,276 @@
+"""
+Overall Purpose:
+---------------
+Command line tools that run without the Streamlit UI: headless bulk generation of question
+banks, and reports over the quiz results store.
+
+Usage:
+    python -m src.cli generate --jobs jobs.jsonl --output bank.jsonl [--concurrency 8] [--mode batch]
+    python -m src.cli accuracy [--by topic difficulty] [--since 2025-01-01] [--until 2025-12-31]
+    python -m src.cli import-results results/*.csv
+
+Here's what's happening:
+- The job file has one JSON object per line:
+  {"topic": "Indian History", "difficulty": "medium", "type": "mcq", "count": 500}
+  (`type` is "mcq" or "fill_blank"; an optional "id" names the job, otherwise it is derived
+  from the normalized topic, difficulty and type, numbered by how often that combination has
+  appeared so far, so adding, removing or reordering other lines keeps the ids stable).
+- Questions are generated concurrently and appended to the output JSONL file as soon as each
+  one is validated, so the output file is also the checkpoint.
+- Running the same command again counts what each job already has in the output file and only
+  generates the rest, so an interrupted run resumes without regenerating finished items.
+- Questions that (nearly) duplicate one already in the output for the same topic, difficulty
+  and type are rejected and generated again (see `src.generator.dedup`).
+- Throughput stats are printed at the end.
+
+`accuracy` prints per-topic / per-difficulty accuracy over the whole results history, and
+`import-results` loads old per-quiz CSV files into the results store.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+from src.config.settings import settings
+from src.generator.question_generator import QuestionGenerator, QUESTION_TYPE_MCQ, QUESTION_TYPE_FILL_BLANK
+from src.generator.dedup import QuestionIndex, question_text
+from src.common.logger import get_logger
+
+logger = get_logger("cli")
+
+# Accepted spellings of the question type in a job file
+QUESTION_TYPES = {
+    "mcq": QUESTION_TYPE_MCQ,
+    "multiple choice": QUESTION_TYPE_MCQ,
+    "multiple_choice": QUESTION_TYPE_MCQ,
+    "fill_blank": QUESTION_TYPE_FILL_BLANK,
+    "fill in the blank": QUESTION_TYPE_FILL_BLANK,
+    "fill-in-the-blank": QUESTION_TYPE_FILL_BLANK,
+}
+
+
+# Read and validate the job file
+def load_jobs(path: str) -> list:
+    jobs, occurrences = [], {}
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            question_type = QUESTION_TYPES.get(str(row.get("type", "mcq")).strip().lower())
+            if question_type is None:
+                raise ValueError(f"Line {line_number}: unknown question type '{row.get('type')}'")
+            if not row.get("topic"):
+                raise ValueError(f"Line {line_number}: 'topic' is required")
+
+            difficulty = str(row.get("difficulty", "medium")).strip().lower()
+            key = bank_key(row["topic"], difficulty, question_type)
+            occurrences[key] = occurrences.get(key, 0) + 1
+            jobs.append({
+                "id": str(row.get("id") or "{}|{}|{}#{}".format(*key, occurrences[key])),
+                "topic": row["topic"],
+                "difficulty": difficulty,
+                "type": question_type,
+                "count": int(row.get("count", 1)),
+            })
+    return jobs
+
+
+# Questions of the same topic, difficulty and type share one duplicate index
+def bank_key(topic: str, difficulty: str, question_type: str) -> tuple:
+    return " ".join(topic.lower().split()), difficulty.lower(), question_type
+
+
+# Count the questions each job already has in the output file (the checkpoint) and index them for dedup
+def load_progress(path: str) -> tuple:
+    done, banks = {}, {}
+    if not os.path.exists(path):
+        return done, banks
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+                job_id = row["job_id"]
+                key = bank_key(row["topic"], row["difficulty"], row["type"])
+            except (ValueError, KeyError, TypeError, AttributeError):
+                continue  # A line cut short by an interrupted run
+            done[job_id] = done.get(job_id, 0) + 1
+            if settings.DEDUP_ENABLED:
+                banks.setdefault(key, QuestionIndex()).add(question_text(row["question"]))
+    return done, banks
+
+
+class JsonlWriter:
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(path, "a+", encoding="utf-8")
+        # If the last run was killed mid-line, start on a fresh line
+        if self.file.tell() > 0:
+            self.file.seek(self.file.tell() - 1)
+            if self.file.read(1) != "\n":
+                self.file.write("\n")
+
+    def write(self, job: dict, question):
+        record = {
+            "job_id": job["id"],
+            "topic": job["topic"],
+            "difficulty": job["difficulty"],
+            "type": job["type"],
+            "question": question.dict(),
+        }
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+async def run_jobs(generator, jobs: list, writer: JsonlWriter, done: dict, banks: dict,
+                   concurrency: int, mode: str) -> dict:
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    stats = {"generated": 0, "failed": 0, "skipped": 0, "duplicates": 0}
+
+    # Write the question unless it duplicates one already in the bank for this job's topic
+    def accept(job, question) -> bool:
+        if settings.DEDUP_ENABLED:
+            bank = banks.setdefault(bank_key(job["topic"], job["difficulty"], job["type"]), QuestionIndex())
+            if not bank.add_if_new(question_text(question)):
+                stats["duplicates"] += 1
+                return False
+        writer.write(job, question)
+        stats["generated"] += 1
+        return True
+
+    async def generate_one(job):
+        async with semaphore:
+            # A duplicate is thrown away and the slot is generated again
+            for _ in range(settings.DEDUP_MAX_ROUNDS + 1):
+                try:
+                    if job["type"] == QUESTION_TYPE_MCQ:
+                        question = await generator.agenerate_mcq(job["topic"], job["difficulty"])
+                    else:
+                        question = await generator.agenerate_fill_blank(job["topic"], job["difficulty"])
+                except Exception as e:
+                    logger.error(f"Job '{job['id']}': question failed: {str(e)}")
+                    break
+                if accept(job, question):
+                    return
+            stats["failed"] += 1
+
+    async def generate_batch(job, size):
+        async with semaphore:
+            pending = size
+            for _ in range(settings.DEDUP_MAX_ROUNDS + 1):
+                # Batch generation is synchronous, so it runs in a worker thread
+                results = await asyncio.to_thread(generator.generate_batch, job["type"], job["topic"], job["difficulty"], pending)
+                pending = 0
+                for question in results:
+                    if isinstance(question, BaseException):
+                        stats["failed"] += 1
+                    elif not accept(job, question):
+                        pending += 1
+                if not pending:
+                    return
+            stats["failed"] += pending
+
+    tasks = []
+    for job in jobs:
+        remaining = job["count"] - done.get(job["id"], 0)
+        stats["skipped"] += min(job["count"], done.get(job["id"], 0))
+        if remaining <= 0:
+            continue
+        logger.info(f"Job '{job['id']}': generating {remaining} of {job['count']} questions")
+        if mode == "batch":
+            batch_size = max(1, settings.MAX_BATCH_SIZE)
+            for start in range(0, remaining, batch_size):
+                tasks.append(generate_batch(job, min(batch_size, remaining - start)))
+        else:
+            tasks.extend(generate_one(job) for _ in range(remaining))
+
+    await asyncio.gather(*tasks)
+    return stats
+
+
+def generate(args) -> int:
+    jobs = load_jobs(args.jobs)
+    done, banks = load_progress(args.output)
+    total = sum(job["count"] for job in jobs)
+
+    generator = QuestionGenerator()
+    writer = JsonlWriter(args.output)
+    start = time.perf_counter()
+    try:
+        stats = asyncio.run(run_jobs(generator, jobs, writer, done, banks, args.concurrency, args.mode))
+    except KeyboardInterrupt:
+        print("Interrupted; run the same command again to resume.", file=sys.stderr)
+        return 130
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - start
+
+    summary = {
+        "jobs": len(jobs),
+        "requested": total,
+        "already_done": stats["skipped"],
+        "generated": stats["generated"],
+        "failed": stats["failed"],
+        "duplicates_rejected": stats["duplicates"],
+        "seconds": round(elapsed, 2),
+        "questions_per_second": round(stats["generated"] / elapsed, 3) if elapsed else 0.0,
+    }
+    print(json.dumps(summary, indent=2))
+    # Non-zero exit code when some questions are still missing, so a script can re-run the command
+    return 0 if stats["failed"] == 0 else 1
+
+
+def accuracy(args) -> int:
+    from src.storage.results_store import get_results_store
+    print(json.dumps(get_results_store().accuracy(args.by, args.since, args.until), indent=2))
+    return 0
+
+
+def import_results(args) -> int:
+    from src.storage.results_store import get_results_store
+    store = get_results_store()
+    for path in args.files:
+        store.import_csv(path)
+    store.flush()
+    print(f"Imported {len(args.files)} result files into {store.path}")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="Study Buddy AI command line tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate_parser = commands.add_parser("generate", help="Generate a question bank from a JSONL job file")
+    generate_parser.add_argument("--jobs", required=True, help="JSONL file of {topic, difficulty, type, count} rows")
+    generate_parser.add_argument("--output", required=True, help="JSONL file the questions are appended to")
+    generate_parser.add_argument("--concurrency", type=int, default=settings.MAX_CONCURRENCY,
+                                 help="Maximum number of LLM calls in flight")
+    generate_parser.add_argument("--mode", choices=["concurrent", "batch"], default="concurrent",
+                                 help="One question per LLM call, or several per call")
+    generate_parser.set_defaults(handler=generate)
+
+    accuracy_parser = commands.add_parser("accuracy", help="Accuracy over the stored quiz results")
+    accuracy_parser.add_argument("--by", nargs="+", default=["topic"],
+                                 choices=["topic", "difficulty", "question_type", "quiz_date"])
+    accuracy_parser.add_argument("--since", help="First quiz date to include (YYYY-MM-DD)")
+    accuracy_parser.add_argument("--until", help="Last quiz date to include (YYYY-MM-DD)")
+    accuracy_parser.set_defaults(handler=accuracy)
+
+    import_parser = commands.add_parser("import-results", help="Load old per-quiz CSV files into the results store")
+    import_parser.add_argument("files", nargs="+")
+    import_parser.set_defaults(handler=import_results)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+import asyncio
+import threading
+
+# A single background event loop for the whole process.
+# Async HTTP clients stay bound to the loop that opened their connections, so running every
+# coroutine on the same long-lived loop lets keep-alive connections be reused across quizzes
+# (a fresh `asyncio.run` per quiz would strand them on a closed loop).
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="async-runner", daemon=True).start()
+        return _loop
+
+
+# Run a coroutine on the shared loop from synchronous code and wait for its result
+def run_async(coro):
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
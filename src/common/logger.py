@@ -1,19 +1,224 @@
+"""
+Overall Purpose:
+---------------
+Non-blocking logging for the app.
+
+Here's what's happening:
+- Loggers put records on an in-memory queue (`QueueHandler`); a background `QueueListener`
+  thread writes them to disk, so logging on the request path costs a queue put.
+- The file handler buffers writes and flushes in batches (immediately for errors); while no
+  records arrive, the listener thread flushes what is left once `LOG_FLUSH_INTERVAL` is up.
+- Log files are named by day (`logs/log_YYYY-MM-DD.log`) and switch at midnight, are rotated
+  by size within a day, and day files older than the retention period are deleted.
+- Output is plain text or JSON lines (`LOG_FORMAT`), at a configurable level (`LOG_LEVEL`).
+- High-volume per-attempt messages (logged with `extra={"sampled": True}`) can be sampled
+  with `LOG_ATTEMPT_SAMPLE_RATE`.
+
+Nothing is set up at import time: the pipeline (and the logs directory) is created the first
+time `get_logger` is called.
+"""
+
+import atexit
+import glob
+import json
 import logging
 import os
-from datetime import datetime
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from src.config.settings import settings
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_listener = None
+_queue_handler = None
+_setup_lock = threading.Lock()
+
+
+class DailyRotatingFileHandler(RotatingFileHandler):
+    """Writes to one file per day, rotates by size within the day and flushes in batches."""
+
+    def __init__(self, log_dir: str, max_bytes: int, backup_count: int, retention_days: int,
+                 flush_records: int, flush_interval: float):
+        self.log_dir = log_dir
+        self.retention_days = retention_days
+        self.flush_records = flush_records
+        self.flush_interval = flush_interval
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self._day = self._today()
+        super().__init__(self._path_for(self._day), maxBytes=max_bytes, backupCount=backup_count,
+                         encoding="utf-8", delay=True)
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now().strftime('%Y-%m-%d')
+
+    def _path_for(self, day: str) -> str:
+        return os.path.abspath(os.path.join(self.log_dir, f"log_{day}.log"))
+
+    def shouldRollover(self, record) -> bool:
+        # A new day starts a new file; otherwise rotate when the size cap is reached
+        return self._today() != self._day or super().shouldRollover(record)
+
+    def doRollover(self):
+        today = self._today()
+        if today == self._day:
+            super().doRollover()
+            return
+
+        if self.stream:
+            self._flush_now()
+            self.stream.close()
+            self.stream = None
+        self._day = today
+        self.baseFilename = self._path_for(today)
+        self._delete_old_files()
+
+    def _delete_old_files(self):
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).strftime('%Y-%m-%d')
+        for path in glob.glob(os.path.join(self.log_dir, "log_*.log*")):
+            day = os.path.basename(path)[len("log_"):len("log_") + 10]
+            if day < cutoff:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def emit(self, record):
+        super().emit(record)
+        # Never keep errors in the buffer
+        if record.levelno >= logging.ERROR:
+            self._flush_now()
+
+    # Called by StreamHandler after every record; only actually flush every N records or T seconds
+    def flush(self):
+        self._pending += 1
+        if self._pending >= self.flush_records:
+            self._flush_now()
+        else:
+            self.flush_if_due()
+
+    # Flush buffered records once the flush interval is up (also called by the listener when idle)
+    def flush_if_due(self):
+        if self._pending and time.monotonic() - self._last_flush >= self.flush_interval:
+            self._flush_now()
+
+    def _flush_now(self):
+        self.acquire()
+        try:
+            if self.stream and hasattr(self.stream, "flush"):
+                self.stream.flush()
+        finally:
+            self.release()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        self._flush_now()
+        super().close()
+
+
+class FlushingQueueListener(QueueListener):
+    """QueueListener that flushes its handlers' buffered records while the queue is quiet."""
+
+    def __init__(self, log_queue, *handlers, flush_interval: float, respect_handler_level: bool = False):
+        super().__init__(log_queue, *handlers, respect_handler_level=respect_handler_level)
+        self.flush_interval = flush_interval
+
+    def dequeue(self, block):
+        if not block or self.flush_interval <= 0:
+            return super().dequeue(block)
+        while True:
+            try:
+                return self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                for handler in self.handlers:
+                    if hasattr(handler, "flush_if_due"):
+                        handler.flush_if_due()
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per line, including any extra fields passed to the logger."""
+
+    _RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "sampled"}
+
+    def format(self, record) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update({k: v for k, v in vars(record).items() if k not in self._RESERVED})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class AttemptSamplingFilter(logging.Filter):
+    """Keeps only a share of the records marked with `extra={"sampled": True}` (below WARNING)."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record) -> bool:
+        if self.rate >= 1 or not getattr(record, "sampled", False) or record.levelno >= logging.WARNING:
+            return True
+        return random.random() < self.rate
+
+
+def _setup():
+    global _listener, _queue_handler
+    with _setup_lock:
+        if _listener is not None:
+            return
+
+        os.makedirs(settings.LOG_DIR, exist_ok=True)
+        file_handler = DailyRotatingFileHandler(
+            settings.LOG_DIR,
+            max_bytes=settings.LOG_MAX_BYTES,
+            backup_count=settings.LOG_BACKUP_COUNT,
+            retention_days=settings.LOG_RETENTION_DAYS,
+            flush_records=settings.LOG_FLUSH_RECORDS,
+            flush_interval=settings.LOG_FLUSH_INTERVAL,
+        )
+        file_handler.setFormatter(JsonLinesFormatter() if settings.LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+
+        # The request path only puts records on this queue; the listener thread does the disk I/O
+        log_queue = queue.Queue(-1)
+        _queue_handler = QueueHandler(log_queue)
+        _queue_handler.addFilter(AttemptSamplingFilter(settings.LOG_ATTEMPT_SAMPLE_RATE))
+
+        root = logging.getLogger()
+        root.addHandler(_queue_handler)
+        root.setLevel(settings.LOG_LEVEL)
+
+        _listener = FlushingQueueListener(log_queue, file_handler, flush_interval=settings.LOG_FLUSH_INTERVAL,
+                                          respect_handler_level=True)
+        _listener.start()
+        # Drain the queue and flush the file when the process exits
+        atexit.register(shutdown_logging)
 
-LOGS_DIR = "logs"
-os.makedirs(LOGS_DIR,exist_ok=True)
 
-LOG_FILE = os.path.join(LOGS_DIR, f"log_{datetime.now().strftime('%Y-%m-%d')}.log")
+# Stop the background writer after draining the queued records (safe to call more than once)
+def shutdown_logging():
+    global _listener, _queue_handler
+    with _setup_lock:
+        if _listener is not None:
+            logging.getLogger().removeHandler(_queue_handler)
+            _listener.stop()
+            _listener = None
+            _queue_handler = None
 
-logging.basicConfig(
-    filename=LOG_FILE,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    level=logging.INFO
-)
 
 def get_logger(name):
+    _setup()
     logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-    return logger
\ No newline at end of file
+    logger.setLevel(settings.LOG_LEVEL)
+    return logger
@@ -8,14 +8,163 @@ class Settings:
     # Get the GROQ API key from the environment variables
     GROQ_API_KEY = os.getenv("GROQ_API_KEY")
     
+    # "groq" for the real Groq API, or "fake" for the offline fake model used by benchmarks and load tests
+    LLM_PROVIDER = os.getenv("LLM_PROVIDER", "groq")
+
+    # Median latency of the fake model in milliseconds (only used when LLM_PROVIDER is "fake")
+    FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", 300))
+
+    # Several backends behind a latency-aware router, as comma-separated "provider:model" entries
+    # (e.g. "groq:llama-3.1-8b-instant,groq:llama-3.3-70b-versatile"; "fake:<latency ms>" for tests).
+    # Empty means a single LLM_PROVIDER client for MODEL_NAME.
+    LLM_BACKENDS = [b.strip() for b in os.getenv("LLM_BACKENDS", "").split(",") if b.strip()]
+
+    # Hedge a request to a second backend once the first is slower than its ROUTER_HEDGE_QUANTILE latency
+    # (ROUTER_HEDGE_DEFAULT_DELAY seconds until a backend has ROUTER_MIN_SAMPLES latency samples)
+    ROUTER_HEDGE_ENABLED = os.getenv("ROUTER_HEDGE_ENABLED", "true").lower() == "true"
+    ROUTER_HEDGE_QUANTILE = float(os.getenv("ROUTER_HEDGE_QUANTILE", 0.95))
+    ROUTER_HEDGE_DEFAULT_DELAY = float(os.getenv("ROUTER_HEDGE_DEFAULT_DELAY", 2.0))
+    ROUTER_MIN_SAMPLES = int(os.getenv("ROUTER_MIN_SAMPLES", 10))
+
+    # Rolling window (calls) for latency and error rate; backends above ROUTER_MAX_ERROR_RATE are used last
+    ROUTER_WINDOW = int(os.getenv("ROUTER_WINDOW", 100))
+    ROUTER_MAX_ERROR_RATE = float(os.getenv("ROUTER_MAX_ERROR_RATE", 0.5))
+
+    # Seconds of recent calls the error rate is computed over, so a degraded backend recovers as errors age out
+    ROUTER_ERROR_WINDOW_SECONDS = float(os.getenv("ROUTER_ERROR_WINDOW_SECONDS", 60))
+
+    # Circuit breaker: stop sending traffic to a backend for ROUTER_COOLDOWN_SECONDS after
+    # ROUTER_FAILURE_THRESHOLD consecutive failures
+    ROUTER_FAILURE_THRESHOLD = int(os.getenv("ROUTER_FAILURE_THRESHOLD", 5))
+    ROUTER_COOLDOWN_SECONDS = float(os.getenv("ROUTER_COOLDOWN_SECONDS", 30))
+
+    # Threads the router uses to race sync calls across backends
+    ROUTER_MAX_WORKERS = int(os.getenv("ROUTER_MAX_WORKERS", 32))
+
+    # Prompt wording: "verbose" (instructions and a worked example in every prompt) or "compact"
+    # (shared system message and a minimal JSON shape); see benchmarks/prompt_report.py
+    PROMPT_VARIANT = os.getenv("PROMPT_VARIANT", "verbose")
+
+    # Ask the model for a JSON object via the provider's JSON mode (response_format); Groq's chat models support it
+    PROMPT_JSON_MODE = os.getenv("PROMPT_JSON_MODE", "false").lower() == "true"
+
     # Set the model name to be used (e.g., LLaMA 3.1 - 8B Instant)
     MODEL_NAME = "llama-3.1-8b-instant"
     
     # Define the temperature for response randomness (higher = more creative)
     TEMPERATURE = 0.9
     
+    # Connection pool used for all LLM calls (keep-alive connections are reused across quizzes)
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 20))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", 10))
+    HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 60))
+    HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", 30))
+
+    # Logging: directory, level, "text" or "json" (JSON lines) output
+    LOG_DIR = os.getenv("LOG_DIR", "logs")
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+
+    # One log file per day, rotated when it reaches LOG_MAX_BYTES; days older than LOG_RETENTION_DAYS are deleted
+    LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))
+    LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 5))
+    LOG_RETENTION_DAYS = int(os.getenv("LOG_RETENTION_DAYS", 14))
+
+    # Log writes are flushed to disk every LOG_FLUSH_RECORDS records or LOG_FLUSH_INTERVAL seconds
+    LOG_FLUSH_RECORDS = int(os.getenv("LOG_FLUSH_RECORDS", 50))
+    LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", 1.0))
+
+    # Share (0-1) of the per-attempt generation messages that are logged
+    LOG_ATTEMPT_SAMPLE_RATE = float(os.getenv("LOG_ATTEMPT_SAMPLE_RATE", 1.0))
+
+    # Build the question generator (imports, LLM client, cache) in the background as soon as the app starts
+    WARMUP_ON_START = os.getenv("WARMUP_ON_START", "true").lower() == "true"
+
+    # Port of the Prometheus-style /metrics endpoint (0 disables the exporter)
+    METRICS_PORT = int(os.getenv("METRICS_PORT", 9100))
+
     # Set the maximum number of retries for API calls if they fail
     MAX_RETRIES = 3
 
+    # Client-side rate limits for LLM calls in this process (0 disables a limit).
+    # Keep (limit x replicas) within the Groq account quota.
+    RATE_LIMIT_REQUESTS_PER_MINUTE = int(os.getenv("RATE_LIMIT_REQUESTS_PER_MINUTE", 30))
+    RATE_LIMIT_TOKENS_PER_MINUTE = int(os.getenv("RATE_LIMIT_TOKENS_PER_MINUTE", 6000))
+
+    # Expected completion size of one question, used to estimate tokens before a call
+    RATE_LIMIT_COMPLETION_TOKENS = int(os.getenv("RATE_LIMIT_COMPLETION_TOKENS", 150))
+
+    # Exponential backoff (with jitter) for rate-limited, timed-out or failed LLM calls
+    BACKOFF_BASE_SECONDS = float(os.getenv("BACKOFF_BASE_SECONDS", 1.0))
+    BACKOFF_MAX_SECONDS = float(os.getenv("BACKOFF_MAX_SECONDS", 30.0))
+
+    # Maximum number of questions generated in parallel for a single quiz
+    MAX_CONCURRENCY = int(os.getenv("MAX_CONCURRENCY", 5))
+
+    # How QuizManager generates a quiz: "sequential" (one call after another), "concurrent"
+    # (parallel calls) or "batch" (several questions per call)
+    GENERATION_MODE = os.getenv("GENERATION_MODE", "concurrent")
+
+    # Maximum number of questions requested from the LLM in a single batch prompt
+    MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", 10))
+
+    # Local on-disk cache of validated questions, reused across quizzes on the same topic
+    QUESTION_CACHE_ENABLED = os.getenv("QUESTION_CACHE_ENABLED", "true").lower() == "true"
+    QUESTION_CACHE_PATH = os.getenv("QUESTION_CACHE_PATH", os.path.join("cache", "questions.db"))
+
+    # How long a cached question stays valid (seconds) and how many questions the cache keeps
+    QUESTION_CACHE_TTL_SECONDS = int(os.getenv("QUESTION_CACHE_TTL_SECONDS", 7 * 24 * 60 * 60))
+    QUESTION_CACHE_MAX_ENTRIES = int(os.getenv("QUESTION_CACHE_MAX_ENTRIES", 10000))
+
+    # Warm pool of pre-generated questions refilled by a background worker (off by default
+    # because refilling spends LLM quota ahead of demand)
+    QUESTION_POOL_ENABLED = os.getenv("QUESTION_POOL_ENABLED", "false").lower() == "true"
+
+    # Refill a topic when it drops below LOW_WATER questions, up to TARGET questions
+    QUESTION_POOL_LOW_WATER = int(os.getenv("QUESTION_POOL_LOW_WATER", 10))
+    QUESTION_POOL_TARGET = int(os.getenv("QUESTION_POOL_TARGET", 20))
+
+    # Maximum number of (topic, difficulty, type) reservoirs kept in memory
+    QUESTION_POOL_MAX_KEYS = int(os.getenv("QUESTION_POOL_MAX_KEYS", 100))
+
+    # Popular topics and difficulties pre-warmed on startup (comma-separated)
+    QUESTION_POOL_PREWARM_TOPICS = [t.strip() for t in os.getenv("QUESTION_POOL_PREWARM_TOPICS", "").split(",") if t.strip()]
+    QUESTION_POOL_PREWARM_DIFFICULTIES = [d.strip() for d in os.getenv("QUESTION_POOL_PREWARM_DIFFICULTIES", "medium").split(",") if d.strip()]
+
+    # Reject generated questions that (nearly) duplicate one already in the quiz or the question bank
+    DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+
+    # Estimated word-overlap (Jaccard) similarity from which two questions count as duplicates
+    DEDUP_SIMILARITY_THRESHOLD = float(os.getenv("DEDUP_SIMILARITY_THRESHOLD", 0.7))
+
+    # MinHash signature length and number of LSH bands (DEDUP_NUM_PERM must be a multiple of DEDUP_BANDS)
+    DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", 32))
+    DEDUP_BANDS = int(os.getenv("DEDUP_BANDS", 8))
+
+    # How many times the slots lost to duplicates are requested again
+    DEDUP_MAX_ROUNDS = int(os.getenv("DEDUP_MAX_ROUNDS", 3))
+
+    # Maximum number of (topic, difficulty, type) bank indexes kept in memory, and how often one is
+    # rebuilt from the question cache so questions that expired or were evicted stop counting
+    DEDUP_BANK_MAX_KEYS = int(os.getenv("DEDUP_BANK_MAX_KEYS", 100))
+    DEDUP_BANK_REFRESH_SECONDS = int(os.getenv("DEDUP_BANK_REFRESH_SECONDS", 15 * 60))
+
+    # Let concurrent identical quiz requests (same topic, difficulty, type and count) share one generation
+    COALESCE_ENABLED = os.getenv("COALESCE_ENABLED", "true").lower() == "true"
+
+    # Longest a coalesced request waits for the next question of the shared generation before
+    # generating the missing questions itself (e.g. when the leader's consumer stopped reading)
+    COALESCE_WAIT_SECONDS = float(os.getenv("COALESCE_WAIT_SECONDS", HTTP_TIMEOUT * MAX_RETRIES))
+
+    # Give every session sharing a generation its own random order of the MCQ options
+    COALESCE_SHUFFLE_OPTIONS = os.getenv("COALESCE_SHUFFLE_OPTIONS", "true").lower() == "true"
+
+    # Append-only SQLite store of submitted quiz results (replaces one CSV file per quiz)
+    RESULTS_STORE_PATH = os.getenv("RESULTS_STORE_PATH", os.path.join("results", "results.db"))
+
+    # Buffered results are written every RESULTS_FLUSH_ROWS rows or RESULTS_FLUSH_INTERVAL seconds
+    RESULTS_FLUSH_ROWS = int(os.getenv("RESULTS_FLUSH_ROWS", 100))
+    RESULTS_FLUSH_INTERVAL = float(os.getenv("RESULTS_FLUSH_INTERVAL", 5.0))
+
 # Create an instance of the Settings class to use its values throughout the project
 settings = Settings()
@@ -0,0 +1,59 @@
+"""
+Overall Purpose:
+---------------
+This module defines `CachedQuestionGenerator`, a drop-in wrapper around `QuestionGenerator`
+that serves quiz questions from the local `QuestionCache` first.
+
+Here's what's happening:
+- A quiz request samples cached questions for the topic/difficulty/type (without repeats).
+- Only the shortfall is generated by the wrapped generator (i.e. the LLM).
+- Newly generated, validated questions are added to the cache for the next quiz.
+- `iter_questions` streams the cached questions first and then the generated ones.
+- Every other attribute (e.g. `generate_mcq`) is forwarded to the wrapped generator.
+"""
+
+from src.cache.question_cache import QuestionCache
+from src.common.logger import get_logger
+
+
+class CachedQuestionGenerator:
+    def __init__(self, generator, cache: QuestionCache):
+        self.generator = generator  # The generator that calls the LLM (e.g. QuestionGenerator)
+        self.cache = cache
+        self.logger = get_logger(self.__class__.__name__)
+
+    # Same contract as `QuestionGenerator.generate_questions`: `count` entries, exceptions for failures
+    def generate_questions(self, question_type: str, topic: str, difficulty: str, count: int, mode: str = None) -> list:
+        cached = self.cache.get(question_type, topic, difficulty, count)
+        shortfall = count - len(cached)
+        self.logger.info(f"Question cache served {len(cached)} of {count} questions for topic '{topic}'")
+
+        if shortfall <= 0:
+            return cached
+
+        # Top up the missing questions from the LLM and remember the valid ones
+        generated = self.generator.generate_questions(question_type, topic, difficulty, shortfall, mode)
+        fresh = [q for q in generated if not isinstance(q, BaseException)]
+        self.cache.put(question_type, topic, difficulty, fresh)
+
+        return cached + generated
+
+    # Streaming version of `generate_questions`: cached questions are yielded first, then the
+    # shortfall as each question is generated
+    def iter_questions(self, question_type: str, topic: str, difficulty: str, count: int):
+        cached = self.cache.get(question_type, topic, difficulty, count)
+        for index, question in enumerate(cached):
+            yield index, question
+
+        fresh = []
+        try:
+            for index, question in self.generator.iter_questions(question_type, topic, difficulty, count - len(cached)):
+                if not isinstance(question, BaseException):
+                    fresh.append(question)
+                yield len(cached) + index, question
+        finally:
+            self.cache.put(question_type, topic, difficulty, fresh)
+
+    # Forward everything else to the wrapped generator
+    def __getattr__(self, name):
+        return getattr(self.generator, name)
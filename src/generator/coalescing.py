@@ -0,0 +1,220 @@
+"""
+Overall Purpose:
+---------------
+This module defines `CoalescingQuestionGenerator`, a wrapper that merges identical quiz
+requests that are in flight at the same time (single-flight).
+
+Here's what's happening:
+- Requests are keyed by (question type, topic, difficulty, question count, generation mode), so
+  only requests that would make the same LLM calls are merged ("stream" for `iter_questions`).
+  The first request for a key (the leader) runs the wrapped generator; requests for the same
+  key that arrive while it runs (followers) wait for it instead of calling the LLM again.
+- Streamed questions (`iter_questions`) are passed on to the followers as soon as the leader
+  receives them.
+- Every caller gets its own copy of the questions with the MCQ options in a fresh random order,
+  so students sharing a generation don't all see the same answer layout.
+- If the leader fails, its error is passed to the followers; if the leader is cancelled (e.g.
+  the browser tab went away mid-stream), each follower generates the questions still missing.
+  The key is released in every case, so the next request starts a fresh generation.
+- A follower that gets no new question for `COALESCE_WAIT_SECONDS` (e.g. the leader's consumer
+  stopped reading the stream without closing it) also generates the missing questions itself.
+- `agenerate_questions` does the same for async callers: the shared task is only cancelled
+  when every caller waiting on it has been cancelled.
+- Every other attribute (e.g. `generate_mcq`) is forwarded to the wrapped generator.
+"""
+
+import asyncio
+import random
+import threading
+import time
+
+from src.config.settings import settings
+from src.common.metrics import counter
+
+COALESCED = counter("quiz_coalesced_requests_total", "Quiz requests served by another request's in-flight generation", ["api"])
+
+
+class _Cancelled(Exception):
+    """The leader stopped (or stalled) before every question was generated."""
+
+
+class _Flight:
+    def __init__(self):
+        self.items = []  # (index, question or exception) in arrival order
+        self.error = None
+        self.done = False
+        self._condition = threading.Condition()
+
+    def publish(self, item):
+        with self._condition:
+            self.items.append(item)
+            self._condition.notify_all()
+
+    def finish(self, error: BaseException = None):
+        with self._condition:
+            self.done = True
+            self.error = error
+            self._condition.notify_all()
+
+    # Yield every item as it is published; raises the leader's error once the items run out,
+    # or `_Cancelled` if no item arrives within `wait_seconds`
+    def follow(self, wait_seconds: float = None):
+        position = 0
+        while True:
+            with self._condition:
+                deadline = time.monotonic() + wait_seconds if wait_seconds is not None else None
+                while position >= len(self.items) and not self.done:
+                    remaining = deadline - time.monotonic() if deadline is not None else None
+                    if remaining is not None and remaining <= 0:
+                        raise _Cancelled("The shared generation stalled")
+                    self._condition.wait(remaining)
+                if position >= len(self.items):
+                    if self.error is not None:
+                        raise self.error
+                    return
+                item = self.items[position]
+            position += 1
+            yield item
+
+
+class _AsyncFlight:
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+
+
+class CoalescingQuestionGenerator:
+    def __init__(self, generator, shuffle_options: bool = None, wait_seconds: float = None):
+        self.generator = generator  # The wrapped generator (e.g. the cached/pooled QuestionGenerator stack)
+        self.shuffle_options = shuffle_options if shuffle_options is not None else settings.COALESCE_SHUFFLE_OPTIONS
+        self.wait_seconds = wait_seconds if wait_seconds is not None else settings.COALESCE_WAIT_SECONDS
+        self._flights = {}
+        self._async_flights = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(question_type: str, topic: str, difficulty: str, count: int, mode: str) -> tuple:
+        return question_type, " ".join(topic.lower().split()), difficulty.strip().lower(), count, mode
+
+    # Join the in-flight generation for the key, or become its leader; returns (flight, is_leader)
+    def _join(self, key: tuple, api: str):
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                COALESCED.inc(api=api)
+                return flight, False
+            flight = self._flights[key] = _Flight()
+            return flight, True
+
+    def _release(self, key: tuple, flight: _Flight, error: BaseException = None):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight.finish(error)
+
+    @staticmethod
+    def _cancelled() -> _Cancelled:
+        return _Cancelled("The shared generation was stopped before it finished")
+
+    # This caller's copy of a question, with the MCQ options in a new random order
+    def _personalize(self, question):
+        if not self.shuffle_options or isinstance(question, BaseException) or not hasattr(question, "options"):
+            return question
+        options = list(question.options)
+        random.shuffle(options)
+        return type(question)(**{**question.dict(), "options": options})
+
+    # Same contract as `QuestionGenerator.generate_questions`: `count` entries, exceptions for failures
+    def generate_questions(self, question_type: str, topic: str, difficulty: str, count: int, mode: str = None) -> list:
+        mode = mode or settings.GENERATION_MODE
+        key = self._key(question_type, topic, difficulty, count, mode)
+        flight, leader = self._join(key, "generate")
+
+        if leader:
+            try:
+                generated = self.generator.generate_questions(question_type, topic, difficulty, count, mode)
+            except BaseException as e:
+                # Followers see the leader's error, or generate for themselves if it was interrupted
+                self._release(key, flight, e if isinstance(e, Exception) else self._cancelled())
+                raise
+            for item in enumerate(generated):
+                flight.publish(item)
+            self._release(key, flight)
+            return [self._personalize(q) for q in generated]
+
+        received = []
+        try:
+            # The leader publishes the whole list at once, after up to `count` LLM calls
+            for item in flight.follow(self.wait_seconds * max(1, count)):
+                received.append(item)
+        except _Cancelled:
+            # Generate the questions the leader did not deliver
+            taken = {index for index, _ in received}
+            free = [index for index in range(count) if index not in taken]
+            received += zip(free, self.generator.generate_questions(question_type, topic, difficulty, len(free), mode))
+        return [self._personalize(q) for _, q in sorted(received, key=lambda item: item[0])]
+
+    # Streaming version of `generate_questions`: followers receive each question as the leader does
+    def iter_questions(self, question_type: str, topic: str, difficulty: str, count: int):
+        key = self._key(question_type, topic, difficulty, count, "stream")
+        flight, leader = self._join(key, "iter")
+
+        if leader:
+            error = self._cancelled()
+            try:
+                for item in self.generator.iter_questions(question_type, topic, difficulty, count):
+                    flight.publish(item)
+                    yield item[0], self._personalize(item[1])
+                error = None
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                # Runs on success, on error and when the consumer stops early (GeneratorExit)
+                self._release(key, flight, error)
+            return
+
+        taken = set()
+        try:
+            for index, question in flight.follow(self.wait_seconds):
+                taken.add(index)
+                yield index, self._personalize(question)
+        except _Cancelled:
+            # The leader went away or stalled: generate the questions it did not deliver
+            free = [index for index in range(count) if index not in taken]
+            for (_, question), index in zip(self.generator.iter_questions(question_type, topic, difficulty, len(free)), free):
+                yield index, self._personalize(question)
+
+    # Async version: concurrent callers with the same key await one shared task
+    async def agenerate_questions(self, question_type: str, topic: str, difficulty: str, count: int) -> list:
+        # Tasks belong to an event loop, so flights are kept per loop
+        key = (id(asyncio.get_running_loop()),) + self._key(question_type, topic, difficulty, count, "async")
+
+        flight = self._async_flights.get(key)
+        if flight is None or flight.task.done():
+            task = asyncio.ensure_future(self.generator.agenerate_questions(question_type, topic, difficulty, count))
+            flight = self._async_flights[key] = _AsyncFlight(task)
+
+            def release(_, key=key, flight=flight):
+                if self._async_flights.get(key) is flight:
+                    del self._async_flights[key]
+
+            task.add_done_callback(release)
+        else:
+            COALESCED.inc(api="async")
+
+        flight.waiters += 1
+        try:
+            # Shielded, so one caller being cancelled doesn't cancel the generation for the others
+            generated = await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()  # Nobody else is waiting for it
+            raise
+        finally:
+            flight.waiters -= 1
+        return [self._personalize(q) for q in generated]
+
+    # Forward everything else to the wrapped generator
+    def __getattr__(self, name):
+        return getattr(self.generator, name)
@@ -0,0 +1,266 @@
+"""
+Overall Purpose:
+---------------
+Near-duplicate detection for generated questions, so a quiz (and the question bank) never
+holds the same question twice in slightly different words.
+
+Here's what's happening:
+- `QuestionIndex` is an in-memory index of questions:
+  - exact duplicates are found with a hash of the normalized text (lowercase, no punctuation);
+  - near-duplicates are found with MinHash signatures of the question's content-word shingles,
+    bucketed with LSH (locality-sensitive hashing), so a lookup only compares a handful of
+    candidates instead of the whole bank.
+  Signatures are kept in one flat 32-bit array (about 1 KB per question with its LSH buckets,
+  ~100 MB for 100k questions) and a lookup stays well under a millisecond
+  (see `benchmarks/dedup_benchmark.py`).
+- `DedupQuestionGenerator` wraps a generator: each generated question is checked against the
+  questions already in the quiz and (optionally) the question bank; duplicates are rejected and
+  only the missing slots are requested again, up to `DEDUP_MAX_ROUNDS` times.
+- Bank indexes are kept for the `DEDUP_BANK_MAX_KEYS` most recently used topics and rebuilt
+  from the question cache every `DEDUP_BANK_REFRESH_SECONDS` (at most the cache TTL), so they
+  follow the cache's expiry and eviction instead of growing forever.
+- Every other attribute (e.g. `generate_mcq`) is forwarded to the wrapped generator.
+"""
+
+import random
+import re
+import threading
+import time
+import zlib
+from array import array
+from collections import OrderedDict
+
+from src.config.settings import settings
+from src.cache.question_cache import make_cache_key
+from src.common.custom_exception import CustomException
+from src.common.logger import get_logger
+from src.common.metrics import counter
+
+DUPLICATES = counter("quiz_duplicate_questions_total", "Generated questions rejected as near-duplicates", ["scope"])
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Words that say nothing about what a question asks; ignored when comparing questions
+_STOPWORDS = frozenset(
+    "a an and are as at be by did do does for from has have how in is it its of on or that the "
+    "these this those to was were what when where which who whom whose why will with".split()
+)
+# Prime modulus of the MinHash permutations (a Mersenne prime, larger than any 32-bit shingle hash)
+_PRIME = (1 << 61) - 1
+
+
+# Lowercase, drop punctuation and collapse whitespace
+def normalize_text(text: str) -> str:
+    return " ".join(_TOKEN_RE.findall(text.lower()))
+
+
+# Text compared for a question: the question plus its answer (accepts a question model or a dict)
+def question_text(question) -> str:
+    data = question if isinstance(question, dict) else question.dict()
+    answer = data.get("correct_answer") or data.get("answer") or ""
+    return f"{data.get('question', '')} {answer}"
+
+
+# Content words and adjacent word pairs of a normalized text
+def shingles(normalized: str) -> set:
+    words = [w for w in normalized.split() if w not in _STOPWORDS]
+    return set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+class QuestionIndex:
+    def __init__(self, threshold: float = None, num_perm: int = None, bands: int = None, seed: int = 1):
+        self.threshold = threshold if threshold is not None else settings.DEDUP_SIMILARITY_THRESHOLD
+        self.num_perm = num_perm or settings.DEDUP_NUM_PERM
+        self.bands = bands or settings.DEDUP_BANDS
+        if self.num_perm % self.bands:
+            raise ValueError("DEDUP_NUM_PERM must be a multiple of DEDUP_BANDS")
+        self.rows = self.num_perm // self.bands
+
+        rng = random.Random(seed)
+        self._permutations = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(self.num_perm)]
+
+        self._exact = set()  # Hashes of the normalized texts
+        self._signatures = array("I")  # Signature of item i at [i * num_perm, (i + 1) * num_perm)
+        self._buckets = {}  # Hash of (band number, band values) -> item id, or a list of ids on collision
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def _signature(self, normalized: str):
+        hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles(normalized)]
+        if not hashes:
+            return None  # Only stopwords: nothing to compare beyond the exact text
+        return [min((a * h + b) % _PRIME for h in hashes) & 0xFFFFFFFF for a, b in self._permutations]
+
+    def _band_keys(self, signature: list) -> list:
+        r = self.rows
+        return [hash((i, *signature[i * r:(i + 1) * r])) for i in range(self.bands)]
+
+    # Estimated Jaccard similarity between a signature and a stored item
+    def _similarity(self, signature: list, item: int) -> float:
+        stored = self._signatures[item * self.num_perm:(item + 1) * self.num_perm]
+        return sum(1 for x, y in zip(signature, stored) if x == y) / self.num_perm
+
+    def _find(self, exact: int, signature, band_keys) -> bool:
+        if exact in self._exact:
+            return True
+        if signature is None:
+            return False
+        checked = set()
+        for key in band_keys:
+            items = self._buckets.get(key, ())
+            for item in (items,) if isinstance(items, int) else items:
+                if item not in checked:
+                    checked.add(item)
+                    if self._similarity(signature, item) >= self.threshold:
+                        return True
+        return False
+
+    def _add(self, exact: int, signature, band_keys):
+        self._exact.add(exact)
+        if signature is None:
+            return
+        item = len(self._signatures) // self.num_perm
+        self._signatures.extend(signature)
+        for key in band_keys:
+            # Most buckets hold a single question, so a plain int saves a list per entry
+            existing = self._buckets.get(key)
+            if existing is None:
+                self._buckets[key] = item
+            elif isinstance(existing, int):
+                self._buckets[key] = [existing, item]
+            else:
+                existing.append(item)
+
+    def _prepare(self, text: str):
+        normalized = normalize_text(text)
+        signature = self._signature(normalized)
+        return hash(normalized), signature, self._band_keys(signature) if signature else None
+
+    # True if the index already holds the same or a near-identical text
+    def contains(self, text: str) -> bool:
+        prepared = self._prepare(text)
+        with self._lock:
+            return self._find(*prepared)
+
+    def add(self, text: str):
+        prepared = self._prepare(text)
+        with self._lock:
+            self._add(*prepared)
+
+    # Add the text unless it is a near-duplicate; returns True if it was added (atomic)
+    def add_if_new(self, text: str) -> bool:
+        prepared = self._prepare(text)
+        with self._lock:
+            if self._find(*prepared):
+                return False
+            self._add(*prepared)
+            return True
+
+
+class DedupQuestionGenerator:
+    def __init__(self, generator, bank=None, max_rounds: int = None, max_bank_keys: int = None,
+                 bank_refresh_seconds: float = None, clock=time.monotonic):
+        self.generator = generator  # The wrapped generator (e.g. QuestionGenerator)
+        self.bank = bank  # Optional QuestionCache holding the question bank
+        self.max_rounds = max_rounds if max_rounds is not None else settings.DEDUP_MAX_ROUNDS
+        self.max_bank_keys = max_bank_keys if max_bank_keys is not None else settings.DEDUP_BANK_MAX_KEYS
+        self.bank_refresh_seconds = bank_refresh_seconds if bank_refresh_seconds is not None else settings.DEDUP_BANK_REFRESH_SECONDS
+        if bank is not None and getattr(bank, "ttl_seconds", None):
+            # Never keep rejecting questions for longer than the cache keeps them
+            self.bank_refresh_seconds = min(self.bank_refresh_seconds, bank.ttl_seconds)
+        self.clock = clock
+        self.logger = get_logger(self.__class__.__name__)
+
+        # One index per (topic, difficulty, question type) of the bank: key -> (index, loaded at), LRU order
+        self._bank_indexes = OrderedDict()
+        self._bank_lock = threading.Lock()
+
+    def _bank_index(self, question_type: str, topic: str, difficulty: str):
+        if self.bank is None:
+            return None
+        key = make_cache_key(question_type, topic, difficulty)
+        with self._bank_lock:
+            now = self.clock()
+            entry = self._bank_indexes.get(key)
+            if entry is None or now - entry[1] >= self.bank_refresh_seconds:
+                # (Re)load from the cache, which has dropped expired and evicted questions
+                index = QuestionIndex()
+                for question in self.bank.questions(question_type, topic, difficulty):
+                    index.add(question_text(question))
+                entry = self._bank_indexes[key] = (index, now)
+            self._bank_indexes.move_to_end(key)
+            while len(self._bank_indexes) > self.max_bank_keys:
+                self._bank_indexes.popitem(last=False)
+            return entry[0]
+
+    # Keep a question only if it is new to this quiz and to the bank
+    @staticmethod
+    def _accept(question, quiz: QuestionIndex, bank) -> bool:
+        text = question_text(question)
+        if quiz.contains(text):
+            DUPLICATES.inc(scope="quiz")
+            return False
+        if bank is not None and not bank.add_if_new(text):
+            DUPLICATES.inc(scope="bank")
+            return False
+        quiz.add(text)
+        return True
+
+    @staticmethod
+    def _duplicate_error() -> CustomException:
+        return CustomException("Could not generate a unique question", "every attempt duplicated an existing question")
+
+    # Same contract as `QuestionGenerator.generate_questions`: `count` entries, exceptions for failures
+    def generate_questions(self, question_type: str, topic: str, difficulty: str, count: int, mode: str = None) -> list:
+        quiz = QuestionIndex()
+        bank = self._bank_index(question_type, topic, difficulty)
+
+        accepted, failures = [], []
+        pending = count
+        for _ in range(self.max_rounds + 1):
+            duplicates = 0
+            for question in self.generator.generate_questions(question_type, topic, difficulty, pending, mode):
+                if isinstance(question, BaseException):
+                    failures.append(question)
+                elif self._accept(question, quiz, bank):
+                    accepted.append(question)
+                else:
+                    duplicates += 1
+
+            # Only the slots lost to duplicates are requested again
+            pending = duplicates
+            if not pending:
+                break
+            self.logger.info(f"Rejected {duplicates} duplicate questions for topic '{topic}', requesting replacements")
+
+        return accepted + failures + [self._duplicate_error() for _ in range(pending)]
+
+    # Streaming version of `generate_questions`: questions are yielded as soon as they pass the check
+    def iter_questions(self, question_type: str, topic: str, difficulty: str, count: int):
+        quiz = QuestionIndex()
+        bank = self._bank_index(question_type, topic, difficulty)
+
+        slot = 0
+        pending = count
+        for _ in range(self.max_rounds + 1):
+            duplicates = 0
+            for _, question in self.generator.iter_questions(question_type, topic, difficulty, pending):
+                if isinstance(question, BaseException) or self._accept(question, quiz, bank):
+                    yield slot, question
+                    slot += 1
+                else:
+                    duplicates += 1
+
+            pending = duplicates
+            if not pending:
+                break
+            self.logger.info(f"Rejected {duplicates} duplicate questions for topic '{topic}', requesting replacements")
+
+        for _ in range(pending):
+            yield slot, self._duplicate_error()
+            slot += 1
+
+    # Forward everything else to the wrapped generator
+    def __getattr__(self, name):
+        return getattr(self.generator, name)
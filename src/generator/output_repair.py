@@ -0,0 +1,207 @@
+"""
+Overall Purpose:
+---------------
+Cheap local repair of malformed LLM output, tried before paying for another LLM call.
+
+Here's what's happening:
+- JSON is pulled out of code fences or surrounding prose.
+- Common JSON mistakes are fixed: trailing commas, single quotes, smart quotes and Python literals.
+- MCQ answers are fixed: options are trimmed and de-duplicated, extra options are dropped
+  (keeping the correct one), and `correct_answer` is matched to an option that differs only
+  in case, spacing or punctuation, to an option letter like "B", or to a clearly closest
+  option with the same numbers (so "Louis XIV" never becomes "Louis XV"). Anything less
+  certain is left for validation to reject, and the question is re-prompted.
+- Fill-in-the-blank markers such as `___`, `[blank]` or `<blank>` are normalized to `_____`.
+- `repair_stats` counts how many LLM retries the repair stage saved.
+"""
+
+import difflib
+import json
+import re
+import threading
+
+from src.common.metrics import counter
+
+# The blank marker the app expects in fill-in-the-blank questions
+BLANK = "_____"
+
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.S)
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+_BLANK_RE = re.compile(r"(?<!\w)_{2,}(?!\w)|\[\s*blank\s*\]|<\s*blank\s*>|\{\s*blank\s*\}|\(\s*blank\s*\)", re.I)
+_OPTION_LETTER_RE = re.compile(r"^\(?([A-Da-d])[\).:]?(?:\s|$)")
+_NUMBER_TOKEN_RE = re.compile(r"\d+|[A-Za-z]+")
+_ROMAN_RE = re.compile(r"m{0,4}(?:cm|cd|d?c{0,3})(?:xc|xl|l?x{0,3})(?:ix|iv|v?i{0,3})")
+# Lowercase words spelled with roman numeral letters that are usually words, units or sizes
+_NOT_NUMERALS = frozenset("mix mi di li cc cl cm dl mm ml xl cd dc".split())
+
+# Fuzzy answer matching: minimum similarity, and how far ahead of the runner-up the best option must be
+FUZZY_CUTOFF = 0.8
+FUZZY_MIN_GAP = 0.1
+
+REPAIRS = counter("quiz_output_repairs_total", "Invalid LLM answers sent to the local repair stage", ["result"])
+
+
+class RepairStats:
+    def __init__(self):
+        self.attempts = 0  # Invalid responses that went through the repair stage
+        self.saved_retries = 0  # Repairs that produced a valid question, i.e. LLM calls avoided
+        self._lock = threading.Lock()
+
+    def record(self, repaired: bool):
+        with self._lock:
+            self.attempts += 1
+            if repaired:
+                self.saved_retries += 1
+        REPAIRS.inc(result="saved_retry" if repaired else "failed")
+
+    def as_dict(self) -> dict:
+        return {"attempts": self.attempts, "saved_retries": self.saved_retries}
+
+
+# Process-wide counters for the repair stage
+repair_stats = RepairStats()
+
+
+# Return the JSON part of an LLM answer (inside a code fence, or the outermost {...} / [...])
+def extract_json(text: str) -> str:
+    fenced = _FENCE_RE.search(text)
+    if fenced:
+        text = fenced.group(1)
+
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        raise ValueError("No JSON found in LLM output")
+    start = min(starts)
+    end = text.rfind("}" if text[start] == "{" else "]")
+    if end < start:
+        raise ValueError("Unterminated JSON in LLM output")
+    return text[start:end + 1]
+
+
+# Parse JSON from LLM output, fixing the usual small syntax mistakes
+def loads_lenient(text: str):
+    raw = extract_json(text)
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        pass
+
+    fixed = raw.replace("“", '"').replace("”", '"').replace("‘", "'").replace("’", "'")
+    fixed = _TRAILING_COMMA_RE.sub(r"\1", fixed)
+    try:
+        return json.loads(fixed)
+    except json.JSONDecodeError:
+        pass
+
+    # Last resort: a Python-style dict with single quotes and True/False/None literals
+    fixed = re.sub(r"\bTrue\b", "true", re.sub(r"\bFalse\b", "false", re.sub(r"\bNone\b", "null", fixed)))
+    fixed = re.sub(r"(?<![A-Za-z0-9])'|'(?![A-Za-z0-9])", '"', fixed)
+    return json.loads(fixed)
+
+
+# Fix an MCQ dict so it has exactly 4 distinct options and a `correct_answer` taken from them
+def repair_mcq(data: dict) -> dict:
+    if not isinstance(data, dict):
+        raise ValueError("MCQ output is not a JSON object")
+    data = dict(data)
+
+    options = []
+    for option in data.get("options") or []:
+        option = str(option).strip()
+        if option and option.lower() not in {o.lower() for o in options}:
+            options.append(option)
+
+    answer = str(data.get("correct_answer", "")).strip()
+    answer = _match_option(answer, options)
+
+    # Too many options: keep the correct one plus the first others
+    if len(options) > 4:
+        others = [o for o in options if o != answer][:3]
+        options = [o for o in options if o == answer or o in others]
+
+    data["options"] = options
+    data["correct_answer"] = answer
+    return data
+
+
+# Lowercase, drop punctuation and collapse whitespace, for comparing an answer with an option
+def _normalize_option(text: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+# Numbers and roman numerals in a text ("World War II" -> ["ii"]). A roman numeral counts when it
+# is uppercase, or lowercase with at least 2 letters and not a common word ("mix", "i" and "cm" don't);
+# an "I" followed by a lowercase word is the pronoun
+def _numbers(text: str) -> list:
+    tokens = _NUMBER_TOKEN_RE.findall(text)
+    numbers = []
+    for position, token in enumerate(tokens):
+        lower = token.lower()
+        if token.isdigit():
+            numbers.append(token)
+        elif not _ROMAN_RE.fullmatch(lower):
+            continue
+        elif token == "I" and position + 1 < len(tokens) and tokens[position + 1].islower():
+            continue
+        elif token.isupper() or (len(token) >= 2 and lower not in _NOT_NUMERALS):
+            numbers.append(lower)
+    return numbers
+
+
+# Map an answer to one of the options: exact, equal after normalizing, option letter, then a clear closest match
+def _match_option(answer: str, options: list) -> str:
+    if answer in options:
+        return answer
+
+    normalized = {_normalize_option(o): o for o in options}
+    if _normalize_option(answer) in normalized:
+        return normalized[_normalize_option(answer)]
+
+    letter = _OPTION_LETTER_RE.match(answer)
+    if letter:
+        index = ord(letter.group(1).upper()) - ord("A")
+        remainder = answer[letter.end():].strip()
+        # "B) Paris" -> "Paris"; a bare "B" -> the second option
+        if remainder:
+            return _match_option(remainder, options)
+        if index < len(options):
+            return options[index]
+
+    # A typo is fixed only when one option is clearly closest and has the same numbers; otherwise
+    # the answer is kept as is, fails validation and the question is re-prompted
+    target = _normalize_option(answer)
+    scores = sorted(
+        ((difflib.SequenceMatcher(None, target, option).ratio(), option) for option in normalized),
+        reverse=True,
+    )
+    if scores:
+        best_score, best = scores[0]
+        runner_up = scores[1][0] if len(scores) > 1 else 0.0
+        if (best_score >= FUZZY_CUTOFF and best_score - runner_up >= FUZZY_MIN_GAP
+                and _numbers(normalized[best]) == _numbers(answer)):
+            return normalized[best]
+    return answer
+
+
+# Fix a fill-in-the-blank dict so the question contains the `_____` marker
+def repair_fill_blank(data: dict) -> dict:
+    if not isinstance(data, dict):
+        raise ValueError("Fill-in-the-blank output is not a JSON object")
+    data = dict(data)
+
+    question = str(data.get("question", ""))
+    answer = str(data.get("answer", "")).strip()
+
+    question = _BLANK_RE.sub(BLANK, question)
+    if BLANK not in question and answer:
+        # The model wrote the answer into the sentence instead of a blank
+        question = re.sub(r"\b" + re.escape(answer) + r"\b", BLANK, question, count=1, flags=re.I)
+
+    data["question"] = question
+    data["answer"] = answer
+    return data
+
+
+# Repair raw LLM text into a dict ready for the question schema
+def repair_output(text: str, repair_item) -> dict:
+    return repair_item(loads_lenient(text))
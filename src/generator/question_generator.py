@@ -1,69 +1,272 @@
 """
 Overall Purpose:
 ---------------
-This module defines the `QuestionGenerator` class that automatically generates quiz questions 
+This module defines the `QuestionGenerator` class that automatically generates quiz questions
 (Multiple Choice Questions and Fill-in-the-Blank) using a large language model (LLM) like Groq's LLaMA.
 
 Here's what's happening:
 - Prompts are sent to an LLM (e.g., LLaMA 3 via Groq).
 - The response is parsed into structured question formats using Pydantic models.
-- There is built-in error handling and retry logic to ensure reliable generation.
-- It logs the progress and errors using a custom logger.
+- There is built-in error handling and retry logic to ensure reliable generation: every LLM call
+  goes through a shared rate limiter, transient failures (rate limits, timeouts) are retried with
+  backoff, and invalid answers are first repaired locally and only re-prompted if that fails.
+- Several questions can be generated concurrently with the async API (`agenerate_questions`),
+  or streamed one by one as soon as each is ready (`iter_questions`).
+- Several questions can also be requested in a single LLM call (`generate_batch`); only the
+  items that fail validation are requested again.
+- It logs the progress and errors using a custom logger, and records per-call metrics (time spent
+  waiting/in the network/parsing/validating, token usage, attempts and failure reasons).
 - It uses custom exceptions to handle any failures cleanly.
 
 The main goal: to programmatically generate and validate high-quality quiz questions from a given topic and difficulty level.
 """
 
 # Import necessary tools and modules
+import asyncio  # Used to run several LLM calls at the same time
+import time  # Used to time each phase of an LLM call
+from concurrent.futures import ThreadPoolExecutor, as_completed  # Used to stream questions as they finish
 from langchain.output_parsers import PydanticOutputParser  # Helps convert LLM text output into structured Python objects
-from src.models.question_schemas import MCQQuestion, FillBlankQuestion  # Defines the structure (schema) for MCQ and Fill-in-the-Blank questions
-from src.prompts.templates import mcq_prompt_template, fill_blank_prompt_template  # Templates that tell the LLM how to format its answers
+from src.models.question_schemas import MCQQuestion, FillBlankQuestion, MCQBatch, FillBlankBatch  # Defines the structure (schema) for MCQ and Fill-in-the-Blank questions
+from src.prompts.templates import get_prompt_set  # Templates that tell the LLM how to format its answers (per prompt variant)
+from src.prompts.token_counter import count_prompt_tokens  # Offline token count of a rendered prompt
 from src.llm.groq_client import get_groq_llm  # Function to connect and get access to the Groq LLM
+from src.llm.rate_limiter import (  # Shared rate limiter and backoff helpers for LLM calls
+    get_rate_limiter,
+    estimate_tokens,
+    backoff_delay,
+    get_retry_after,
+    is_rate_limit_error,
+    is_transient_error,
+)
 from src.config.settings import settings  # App settings, like number of retry attempts and model configs
 from src.common.logger import get_logger  # Function to create a logger for printing messages
+from src.generator.output_repair import (  # Local fixes for malformed LLM output before re-prompting
+    repair_output,
+    repair_mcq,
+    repair_fill_blank,
+    loads_lenient,
+    repair_stats,
+)
 from src.common.custom_exception import CustomException  # Custom error type to handle failures in a readable way
+from src.common.event_loop import run_async  # Runs async generation on the shared background event loop
+from src.common.metrics import counter, histogram  # In-process metrics exported in Prometheus format
+
+# Question types understood by the generator (same labels as shown in the UI)
+QUESTION_TYPE_MCQ = "Multiple Choice"
+QUESTION_TYPE_FILL_BLANK = "Fill in the Blank"
+
+# Output parsers are stateless, so they are built once and shared by every generator
+MCQ_PARSER = PydanticOutputParser(pydantic_object=MCQQuestion)
+FILL_BLANK_PARSER = PydanticOutputParser(pydantic_object=FillBlankQuestion)
+
+# Metrics recorded for every LLM call ("kind" is the schema being generated, e.g. MCQQuestion)
+LLM_PHASE_SECONDS = histogram(
+    "quiz_llm_phase_seconds",
+    "Time spent per LLM call phase (rate_limit_wait, network, parse, validate, repair)",
+    ["kind", "phase"],
+)
+LLM_TOKENS = counter("quiz_llm_tokens_total", "Tokens reported by the LLM", ["kind", "direction"])
+LLM_ATTEMPTS = counter("quiz_llm_attempts_total", "LLM call attempts by attempt number and outcome", ["kind", "attempt", "outcome"])
+LLM_PROMPT_TOKENS = histogram(
+    "quiz_llm_prompt_tokens",
+    "Estimated tokens of each rendered prompt sent to the LLM",
+    ["kind", "variant"],
+    buckets=(25, 50, 100, 200, 400, 800, 1600, 3200),
+)
+LLM_FAILURES = counter("quiz_llm_failures_total", "Failed LLM call attempts by stage and error type", ["kind", "stage", "reason"])
+
+
+# Prompt/completion token counts from a chat model response (LangChain usage metadata or raw provider usage)
+def _token_usage(response):
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+    usage = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+    return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
 
 # Main class that generates quiz questions using a language model (LLM)
 class QuestionGenerator:
-    def __init__(self):
-        # Create an instance of the language model and a logger
-        self.llm = get_groq_llm()  # This connects to Groq's LLM (like LLaMA)
+    def __init__(self, llm=None, rate_limiter=None, prompt_variant: str = None, json_mode: bool = None):
+        # Use the given language model (e.g. a fake one for benchmarks) or the shared Groq client
+        self.llm = llm or get_groq_llm()  # This connects to Groq's LLM (like LLaMA)
+        self.rate_limiter = rate_limiter or get_rate_limiter()  # Shared budget of requests/tokens per minute
+        self.prompts = get_prompt_set(prompt_variant)  # Prompt wording (Settings.PROMPT_VARIANT by default)
+        self.json_mode = settings.PROMPT_JSON_MODE if json_mode is None else json_mode  # Ask the provider for a JSON object
         self.logger = get_logger(self.__class__.__name__)  # Logger will use the class name (QuestionGenerator)
 
     # Private helper method to send the prompt to the LLM, parse the response, and retry if something goes wrong
-    def _retry_and_parse(self, prompt, parser, topic, difficulty):
+    def _retry_and_parse(self, prompt, parser, topic, difficulty, validate=None, repair=None):
         # Try the generation up to MAX_RETRIES times
         for attempt in range(settings.MAX_RETRIES):
+            self.logger.info(f"Attempt {attempt + 1}: Generating question for topic='{topic}', difficulty='{difficulty}'", extra={"sampled": True})
+
+            kind = parser.pydantic_object.__name__
+
+            # Fill in the topic and difficulty in the prompt and send it to the LLM (waiting for the rate limiter first)
             try:
-                self.logger.info(f"Attempt {attempt + 1}: Generating question for topic='{topic}', difficulty='{difficulty}'")
-                
-                # Fill in the topic and difficulty in the prompt and send it to the LLM
-                response = self.llm.invoke(prompt.format(topic=topic, difficulty=difficulty))
-                
-                # Use the parser to convert the response text into a Python object based on the defined schema
-                parsed = parser.parse(response.content)
-
-                self.logger.info(f"Successfully parsed question on attempt {attempt + 1}")
+                messages = self.prompts.render(prompt, topic=topic, difficulty=difficulty)
+                response = self._call_llm(messages, kind, attempt, estimate_tokens(messages))
+            except Exception as e:
+                # Transport failure: back off before trying again (or give up if it cannot succeed)
+                self.rate_limiter.sleep(self._transport_retry_delay(attempt, e))
+                continue
+
+            try:
+                # Convert the response text into a validated Python object (repairing it locally if needed)
+                parsed = self._parse_and_validate(response.content, parser, validate, repair)
+
+                LLM_ATTEMPTS.inc(kind=kind, attempt=attempt + 1, outcome="success")
+                self.logger.info(f"Successfully parsed question on attempt {attempt + 1}", extra={"sampled": True})
                 return parsed  # Return the parsed (valid) question
             except Exception as e:
-                # If something goes wrong, log the error
+                # Validation failure: re-prompt straight away, there is nothing to wait for
+                self._record_failure(kind, attempt, "validation", e)
                 self.logger.error(f"Attempt {attempt + 1} failed with error: {str(e)}")
                 # If this is the last attempt, raise a custom exception
                 if attempt == settings.MAX_RETRIES - 1:
                     raise CustomException(f"Generation failed after {settings.MAX_RETRIES} attempts", e)
 
+    # Async version of `_retry_and_parse` that uses the chat model's `ainvoke`
+    async def _aretry_and_parse(self, prompt, parser, topic, difficulty, validate=None, repair=None):
+        for attempt in range(settings.MAX_RETRIES):
+            self.logger.info(f"Attempt {attempt + 1}: Generating question for topic='{topic}', difficulty='{difficulty}'", extra={"sampled": True})
+
+            kind = parser.pydantic_object.__name__
+
+            # Await the LLM so other questions can be generated while this one is in flight
+            try:
+                messages = self.prompts.render(prompt, topic=topic, difficulty=difficulty)
+                response = await self._acall_llm(messages, kind, attempt, estimate_tokens(messages))
+            except Exception as e:
+                await self.rate_limiter.async_sleep(self._transport_retry_delay(attempt, e))
+                continue
+
+            try:
+                parsed = self._parse_and_validate(response.content, parser, validate, repair)
+
+                LLM_ATTEMPTS.inc(kind=kind, attempt=attempt + 1, outcome="success")
+                self.logger.info(f"Successfully parsed question on attempt {attempt + 1}", extra={"sampled": True})
+                return parsed
+            except Exception as e:
+                self._record_failure(kind, attempt, "validation", e)
+                self.logger.error(f"Attempt {attempt + 1} failed with error: {str(e)}")
+                if attempt == settings.MAX_RETRIES - 1:
+                    raise CustomException(f"Generation failed after {settings.MAX_RETRIES} attempts", e)
+
+    # Options passed with every LLM call (JSON mode when enabled)
+    def _llm_options(self) -> dict:
+        return {"response_format": {"type": "json_object"}} if self.json_mode else {}
+
+    # Send one prompt (text or chat messages) to the LLM, recording rate-limit wait, network time and token usage
+    def _call_llm(self, messages, kind: str, attempt: int, tokens: int):
+        LLM_PROMPT_TOKENS.observe(count_prompt_tokens(messages), kind=kind, variant=self.prompts.name)
+        start = time.perf_counter()
+        self.rate_limiter.acquire(tokens)
+        sent = time.perf_counter()
+        LLM_PHASE_SECONDS.observe(sent - start, kind=kind, phase="rate_limit_wait")
+        try:
+            response = self.llm.invoke(messages, **self._llm_options())
+        except Exception as e:
+            self._record_failure(kind, attempt, "transport", e)
+            raise
+        finally:
+            LLM_PHASE_SECONDS.observe(time.perf_counter() - sent, kind=kind, phase="network")
+        self._record_tokens(kind, response)
+        return response
+
+    # Async version of `_call_llm`
+    async def _acall_llm(self, messages, kind: str, attempt: int, tokens: int):
+        LLM_PROMPT_TOKENS.observe(count_prompt_tokens(messages), kind=kind, variant=self.prompts.name)
+        start = time.perf_counter()
+        await self.rate_limiter.aacquire(tokens)
+        sent = time.perf_counter()
+        LLM_PHASE_SECONDS.observe(sent - start, kind=kind, phase="rate_limit_wait")
+        try:
+            response = await self.llm.ainvoke(messages, **self._llm_options())
+        except Exception as e:
+            self._record_failure(kind, attempt, "transport", e)
+            raise
+        finally:
+            LLM_PHASE_SECONDS.observe(time.perf_counter() - sent, kind=kind, phase="network")
+        self._record_tokens(kind, response)
+        return response
+
+    @staticmethod
+    def _record_tokens(kind: str, response):
+        prompt_tokens, completion_tokens = _token_usage(response)
+        LLM_TOKENS.inc(prompt_tokens, kind=kind, direction="prompt")
+        LLM_TOKENS.inc(completion_tokens, kind=kind, direction="completion")
+
+    @staticmethod
+    def _record_failure(kind: str, attempt: int, stage: str, error: Exception):
+        LLM_ATTEMPTS.inc(kind=kind, attempt=attempt + 1, outcome=f"{stage}_error")
+        LLM_FAILURES.inc(kind=kind, stage=stage, reason=type(error).__name__)
+
+    # Parse the LLM answer and run the structure check. If either fails, try the cheap local repair
+    # stage before giving up, so a fixable answer does not cost another LLM call.
+    def _parse_and_validate(self, text, parser, validate=None, repair=None):
+        kind = parser.pydantic_object.__name__
+        start = time.perf_counter()
+        try:
+            parsed = parser.parse(text)
+            parsed_at = time.perf_counter()
+            LLM_PHASE_SECONDS.observe(parsed_at - start, kind=kind, phase="parse")
+            if validate:
+                validate(parsed)
+                LLM_PHASE_SECONDS.observe(time.perf_counter() - parsed_at, kind=kind, phase="validate")
+            return parsed
+        except Exception as e:
+            if repair is None:
+                raise
+            repair_start = time.perf_counter()
+            try:
+                parsed = parser.pydantic_object.parse_obj(repair_output(text, repair))
+                if validate:
+                    validate(parsed)
+            except Exception:
+                repair_stats.record(repaired=False)
+                raise e
+            finally:
+                LLM_PHASE_SECONDS.observe(time.perf_counter() - repair_start, kind=kind, phase="repair")
+            repair_stats.record(repaired=True)
+            self.logger.info(f"Repaired invalid LLM output locally ({str(e)})")
+            return parsed
+
+    # Decide what to do after a failed LLM call: return how long to back off before the next attempt,
+    # or raise if the error cannot be fixed by retrying (e.g. invalid API key) or this was the last attempt
+    def _transport_retry_delay(self, attempt: int, error: Exception) -> float:
+        self.logger.error(f"Attempt {attempt + 1}: LLM call failed with error: {str(error)}")
+
+        if not is_transient_error(error):
+            raise CustomException("LLM call failed with a non-retryable error", error)
+        if attempt == settings.MAX_RETRIES - 1:
+            raise CustomException(f"Generation failed after {settings.MAX_RETRIES} attempts", error)
+
+        retry_after = get_retry_after(error)
+        delay = backoff_delay(attempt, retry_after)
+        if is_rate_limit_error(error):
+            # Slow down every session sharing the limiter, not just this one
+            self.rate_limiter.pause(delay)
+        self.logger.info(f"Backing off for {delay:.2f}s before attempt {attempt + 2}")
+        return delay
+
+    # Extra check: MCQ must have exactly 4 options, and correct answer should be one of them
+    @staticmethod
+    def _validate_mcq(question: MCQQuestion):
+        if len(question.options) != 4 or question.correct_answer not in question.options:
+            raise ValueError("Invalid MCQ structure")
+
+    # Extra check: The question must have a blank represented by "_____"
+    @staticmethod
+    def _validate_fill_blank(question: FillBlankQuestion):
+        if "_____" not in question.question:
+            raise ValueError("Fill-in-the-blank must contain '_____'")
+
     # Public method to generate a Multiple Choice Question
     def generate_mcq(self, topic: str, difficulty: str = 'medium') -> MCQQuestion:
         try:
-            # Set up the output parser for MCQ question format
-            parser = PydanticOutputParser(pydantic_object=MCQQuestion)
-            
-            # Generate the question and parse it using retry logic
-            question = self._retry_and_parse(mcq_prompt_template, parser, topic, difficulty)
-
-            # Extra check: MCQ must have exactly 4 options, and correct answer should be one of them
-            if len(question.options) != 4 or question.correct_answer not in question.options:
-                raise ValueError("Invalid MCQ structure")
+            # Generate the question, parse it with the shared MCQ parser and check its structure using retry logic
+            question = self._retry_and_parse(self.prompts.mcq, MCQ_PARSER, topic, difficulty, self._validate_mcq, repair_mcq)
 
             self.logger.info(f"Generated valid MCQ question for topic '{topic}'")
             return question  # Return the valid MCQ question
@@ -75,15 +278,8 @@ class QuestionGenerator:
     # Public method to generate a Fill-in-the-Blank question
     def generate_fill_blank(self, topic: str, difficulty: str = 'medium') -> FillBlankQuestion:
         try:
-            # Set up the output parser for Fill-in-the-Blank question format
-            parser = PydanticOutputParser(pydantic_object=FillBlankQuestion)
-            
-            # Generate the question and parse it using retry logic
-            question = self._retry_and_parse(fill_blank_prompt_template, parser, topic, difficulty)
-
-            # Extra check: The question must have a blank represented by "_____"
-            if "_____" not in question.question:
-                raise ValueError("Fill-in-the-blank must contain '_____'")
+            # Generate the question, parse it with the shared Fill-in-the-Blank parser and check its structure using retry logic
+            question = self._retry_and_parse(self.prompts.fill_blank, FILL_BLANK_PARSER, topic, difficulty, self._validate_fill_blank, repair_fill_blank)
 
             self.logger.info(f"Generated valid Fill-in-the-Blank question for topic '{topic}'")
             return question  # Return the valid Fill-in-the-Blank question
@@ -91,3 +287,200 @@ class QuestionGenerator:
             # Log and raise a custom error if something goes wrong
             self.logger.error(f"Failed to generate Fill-in-the-Blank question: {str(e)}")
             raise CustomException("Fill-in-the-Blank question generation failed", e)
+
+    # Async version of `generate_mcq`
+    async def agenerate_mcq(self, topic: str, difficulty: str = 'medium') -> MCQQuestion:
+        try:
+            question = await self._aretry_and_parse(self.prompts.mcq, MCQ_PARSER, topic, difficulty, self._validate_mcq, repair_mcq)
+
+            self.logger.info(f"Generated valid MCQ question for topic '{topic}'")
+            return question
+        except Exception as e:
+            self.logger.error(f"Failed to generate MCQ question: {str(e)}")
+            raise CustomException("MCQ question generation failed", e)
+
+    # Async version of `generate_fill_blank`
+    async def agenerate_fill_blank(self, topic: str, difficulty: str = 'medium') -> FillBlankQuestion:
+        try:
+            question = await self._aretry_and_parse(self.prompts.fill_blank, FILL_BLANK_PARSER, topic, difficulty, self._validate_fill_blank, repair_fill_blank)
+
+            self.logger.info(f"Generated valid Fill-in-the-Blank question for topic '{topic}'")
+            return question
+        except Exception as e:
+            self.logger.error(f"Failed to generate Fill-in-the-Blank question: {str(e)}")
+            raise CustomException("Fill-in-the-Blank question generation failed", e)
+
+    # Generate `count` questions concurrently, at most MAX_CONCURRENCY LLM calls at a time.
+    # Returns a list in question order; a question that failed after all its retries is
+    # returned as its exception instead of cancelling the rest of the quiz.
+    async def agenerate_questions(self, question_type: str, topic: str, difficulty: str, count: int) -> list:
+        if question_type == QUESTION_TYPE_MCQ:
+            generate = self.agenerate_mcq
+        elif question_type == QUESTION_TYPE_FILL_BLANK:
+            generate = self.agenerate_fill_blank
+        else:
+            raise CustomException(f"Unknown question type '{question_type}'")
+
+        semaphore = asyncio.Semaphore(max(1, settings.MAX_CONCURRENCY))
+
+        async def generate_one():
+            async with semaphore:
+                return await generate(topic, difficulty)
+
+        return await asyncio.gather(*(generate_one() for _ in range(count)), return_exceptions=True)
+
+    # Generate `count` questions concurrently and yield `(index, question)` pairs as soon as each
+    # question is parsed and validated, so the UI can show the first question after about one LLM call.
+    # A question that failed after all its retries is yielded as its exception.
+    def iter_questions(self, question_type: str, topic: str, difficulty: str, count: int):
+        if question_type == QUESTION_TYPE_MCQ:
+            generate = self.generate_mcq
+        elif question_type == QUESTION_TYPE_FILL_BLANK:
+            generate = self.generate_fill_blank
+        else:
+            raise CustomException(f"Unknown question type '{question_type}'")
+        if count <= 0:
+            return
+
+        executor = ThreadPoolExecutor(max_workers=max(1, min(settings.MAX_CONCURRENCY, count)))
+        futures = {executor.submit(generate, topic, difficulty): index for index in range(count)}
+        try:
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result()
+                except Exception as e:
+                    yield futures[future], e
+        finally:
+            # Don't start questions nobody is waiting for (e.g. the consumer stopped early), and don't
+            # wait for the calls already running: their results are dropped when they finish
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    # Generate `count` questions using the given mode ("sequential", "concurrent" or "batch",
+    # defaulting to Settings.GENERATION_MODE). This is the entry point used by QuizManager.
+    # Returns a list of `count` entries where a question that could not be generated is
+    # replaced by its exception.
+    def generate_questions(self, question_type: str, topic: str, difficulty: str, count: int, mode: str = None) -> list:
+        mode = mode or settings.GENERATION_MODE
+
+        if mode == "batch":
+            # Request all questions in as few LLM calls as possible
+            return self.generate_batch(question_type, topic, difficulty, count)
+        if mode == "concurrent":
+            # Generate all questions in parallel
+            return run_async(self.agenerate_questions(question_type, topic, difficulty, count))
+
+        # Generate questions one after another from the LLM
+        generate = self.generate_mcq if question_type == QUESTION_TYPE_MCQ else self.generate_fill_blank
+        generated = []
+        for _ in range(count):
+            try:
+                generated.append(generate(topic, difficulty))
+            except Exception as e:
+                generated.append(e)
+        return generated
+
+    # Generate `count` questions using as few LLM calls as possible (up to MAX_BATCH_SIZE questions per call).
+    # Every returned item is validated on its own, and only the missing questions are requested again.
+    # Returns a list of `count` entries: valid questions first, followed by an exception for each question
+    # that could not be generated (same convention as `agenerate_questions`).
+    def generate_batch(self, question_type: str, topic: str, difficulty: str, count: int) -> list:
+        if question_type == QUESTION_TYPE_MCQ:
+            template, batch_schema, item_schema, validate, repair = self.prompts.mcq_batch, MCQBatch, MCQQuestion, self._validate_mcq, repair_mcq
+        elif question_type == QUESTION_TYPE_FILL_BLANK:
+            template, batch_schema, item_schema, validate, repair = self.prompts.fill_blank_batch, FillBlankBatch, FillBlankQuestion, self._validate_fill_blank, repair_fill_blank
+        else:
+            raise CustomException(f"Unknown question type '{question_type}'")
+
+        questions = []
+        last_error = None
+        give_up = False
+
+        for attempt in range(settings.MAX_RETRIES):
+            missing = count - len(questions)
+            if missing <= 0 or give_up:
+                break
+
+            # Ask for the missing questions in chunks no larger than MAX_BATCH_SIZE
+            while missing > 0:
+                size = min(missing, max(1, settings.MAX_BATCH_SIZE))
+                self.logger.info(f"Attempt {attempt + 1}: Generating batch of {size} questions for topic='{topic}', difficulty='{difficulty}'", extra={"sampled": True})
+                kind = batch_schema.__name__
+                try:
+                    messages = self.prompts.render(template, topic=topic, difficulty=difficulty, count=size)
+                    response = self._call_llm(messages, kind, attempt, estimate_tokens(messages, size * settings.RATE_LIMIT_COMPLETION_TOKENS))
+                except Exception as e:
+                    last_error = e
+                    try:
+                        # Transport failure: back off before the next attempt
+                        self.rate_limiter.sleep(self._transport_retry_delay(attempt, e))
+                    except CustomException:
+                        give_up = True  # Not worth retrying; stop here
+                    break
+
+                try:
+                    parse_start = time.perf_counter()
+                    items = self._parse_batch_items(response.content, batch_schema)
+                    LLM_PHASE_SECONDS.observe(time.perf_counter() - parse_start, kind=kind, phase="parse")
+                except Exception as e:
+                    self._record_failure(kind, attempt, "validation", e)
+                    self.logger.error(f"Attempt {attempt + 1} batch response could not be parsed: {str(e)}")
+                    last_error = e
+                    break
+
+                accepted = 0
+                for item in items[:size]:
+                    try:
+                        question = self._validate_batch_item(item, item_schema, validate, repair)
+                        questions.append(question)
+                        accepted += 1
+                    except Exception as e:
+                        # Drop only this item; it will be requested again in the next attempt
+                        self.logger.error(f"Attempt {attempt + 1}: discarded invalid batch item: {str(e)}")
+                        last_error = e
+
+                LLM_ATTEMPTS.inc(kind=kind, attempt=attempt + 1, outcome="success" if accepted == size else "partial")
+                self.logger.info(f"Accepted {accepted} of {size} batch questions on attempt {attempt + 1}")
+                missing -= size
+
+        failed = count - len(questions)
+        if failed:
+            self.logger.error(f"Batch generation for topic '{topic}' is missing {failed} of {count} questions")
+        return questions + [
+            CustomException(f"Batch generation failed after {settings.MAX_RETRIES} attempts", last_error)
+            for _ in range(failed)
+        ]
+
+    # Validate one batch item, repairing it locally if it is invalid
+    def _validate_batch_item(self, item, item_schema, validate, repair):
+        try:
+            question = item if isinstance(item, item_schema) else item_schema.parse_obj(item)
+            validate(question)
+            return question
+        except Exception as e:
+            raw = item.dict() if isinstance(item, item_schema) else item
+            try:
+                question = item_schema.parse_obj(repair(raw))
+                validate(question)
+            except Exception:
+                repair_stats.record(repaired=False)
+                raise e
+            repair_stats.record(repaired=True)
+            return question
+
+    # Read the list of raw question items from a batch response.
+    # The whole batch is validated first; if any item is invalid the raw items are returned
+    # so that each one can be validated (and kept or dropped) individually.
+    @staticmethod
+    def _parse_batch_items(text: str, batch_schema) -> list:
+        # Lenient parsing strips code fences and fixes small JSON mistakes (trailing commas, quotes)
+        data = loads_lenient(text)
+        if isinstance(data, list):
+            data = {"questions": data}
+
+        try:
+            return list(batch_schema.parse_obj(data).questions)
+        except Exception:
+            items = data.get("questions") if isinstance(data, dict) else None
+            if not isinstance(items, list):
+                raise ValueError("Batch response has no 'questions' list")
+            return items
@@ -0,0 +1,160 @@
+"""
+Overall Purpose:
+---------------
+This module defines `QuestionPool`, a warm pool of pre-generated questions kept in memory
+for each (topic, difficulty, question type).
+
+Here's what's happening:
+- A quiz request takes questions straight from the pool, so hot topics need no LLM call.
+- Only a shortfall (e.g. the first request on a new topic) is generated on the request path.
+- Whenever a reservoir drops below the low-water mark, a background worker thread refills it
+  up to the target size using the wrapped generator.
+- Popular topics from `Settings` are queued for pre-warming when the pool starts.
+- Every other attribute (e.g. `generate_mcq`) is forwarded to the wrapped generator.
+"""
+
+import queue
+import threading
+from collections import OrderedDict, deque
+
+from src.config.settings import settings
+from src.cache.question_cache import make_cache_key
+from src.common.logger import get_logger
+
+
+class QuestionPool:
+    def __init__(self, generator, low_water: int = None, target: int = None, max_keys: int = None):
+        self.generator = generator  # Generator used to refill the pool (e.g. QuestionGenerator)
+        self.low_water = low_water if low_water is not None else settings.QUESTION_POOL_LOW_WATER
+        self.target = target if target is not None else settings.QUESTION_POOL_TARGET
+        self.max_keys = max_keys if max_keys is not None else settings.QUESTION_POOL_MAX_KEYS
+        self.logger = get_logger(self.__class__.__name__)
+
+        # key -> deque of ready questions; ordered so the least recently used topic is dropped first
+        self._reservoirs = OrderedDict()
+        # key -> (question_type, topic, difficulty) needed to refill that reservoir
+        self._requests = {}
+        self._lock = threading.Lock()
+
+        # Keys waiting for a refill; `_pending` avoids queueing the same key twice
+        self._refill_queue = queue.Queue()
+        self._pending = set()
+        self._worker = None
+
+    # Start the background refill worker and queue the popular topics for pre-warming
+    def start(self, prewarm_topics: list = None, prewarm_difficulties: list = None):
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="question-pool-refill", daemon=True)
+            self._worker.start()
+
+        topics = prewarm_topics if prewarm_topics is not None else settings.QUESTION_POOL_PREWARM_TOPICS
+        difficulties = prewarm_difficulties if prewarm_difficulties is not None else settings.QUESTION_POOL_PREWARM_DIFFICULTIES
+        for topic in topics:
+            for difficulty in difficulties:
+                for question_type in ("Multiple Choice", "Fill in the Blank"):
+                    self.request_refill(question_type, topic, difficulty.lower())
+        return self
+
+    # Same contract as `QuestionGenerator.generate_questions`: `count` entries, exceptions for failures
+    def generate_questions(self, question_type: str, topic: str, difficulty: str, count: int, mode: str = None) -> list:
+        key = make_cache_key(question_type, topic, difficulty)
+
+        with self._lock:
+            reservoir = self._reservoir(key, question_type, topic, difficulty)
+            taken = [reservoir.popleft() for _ in range(min(count, len(reservoir)))]
+
+        self.logger.info(f"Question pool served {len(taken)} of {count} questions for topic '{topic}'")
+
+        # Top up the pool in the background for the next quiz on this topic
+        self.request_refill(question_type, topic, difficulty)
+
+        shortfall = count - len(taken)
+        if shortfall <= 0:
+            return taken
+        return taken + self.generator.generate_questions(question_type, topic, difficulty, shortfall, mode)
+
+    # Streaming version of `generate_questions`: pooled questions are yielded first, then the
+    # shortfall as each question is generated
+    def iter_questions(self, question_type: str, topic: str, difficulty: str, count: int):
+        key = make_cache_key(question_type, topic, difficulty)
+
+        with self._lock:
+            reservoir = self._reservoir(key, question_type, topic, difficulty)
+            taken = [reservoir.popleft() for _ in range(min(count, len(reservoir)))]
+        self.request_refill(question_type, topic, difficulty)
+
+        for index, question in enumerate(taken):
+            yield index, question
+        for index, question in self.generator.iter_questions(question_type, topic, difficulty, count - len(taken)):
+            yield len(taken) + index, question
+
+    # Queue a refill for the key if its reservoir is below the low-water mark
+    def request_refill(self, question_type: str, topic: str, difficulty: str):
+        key = make_cache_key(question_type, topic, difficulty)
+        with self._lock:
+            reservoir = self._reservoir(key, question_type, topic, difficulty)
+            if len(reservoir) >= self.low_water or key in self._pending:
+                return
+            self._pending.add(key)
+        self._refill_queue.put(key)
+
+    # Number of ready questions for each key
+    def sizes(self) -> dict:
+        with self._lock:
+            return {key: len(reservoir) for key, reservoir in self._reservoirs.items()}
+
+    # Forward everything else to the wrapped generator
+    def __getattr__(self, name):
+        return getattr(self.generator, name)
+
+    # Get (or create) the reservoir for a key; callers must hold `self._lock`
+    def _reservoir(self, key, question_type, topic, difficulty):
+        if key in self._reservoirs:
+            self._reservoirs.move_to_end(key)
+            return self._reservoirs[key]
+
+        self._reservoirs[key] = deque()
+        self._requests[key] = (question_type, topic, difficulty)
+        while len(self._reservoirs) > self.max_keys:
+            evicted, _ = self._reservoirs.popitem(last=False)
+            self._requests.pop(evicted, None)
+        return self._reservoirs[key]
+
+    # Background worker: refill one key at a time, forever
+    def _run(self):
+        while True:
+            key = self._refill_queue.get()
+            try:
+                self._refill(key)
+            except Exception as e:
+                self.logger.error(f"Question pool refill failed: {str(e)}")
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+                self._refill_queue.task_done()
+
+    # Generate questions until the reservoir reaches the target size
+    def _refill(self, key):
+        with self._lock:
+            if key not in self._reservoirs:
+                return  # Evicted while waiting in the queue
+            question_type, topic, difficulty = self._requests[key]
+            missing = self.target - len(self._reservoirs[key])
+        if missing <= 0:
+            return
+
+        self.logger.info(f"Refilling question pool with {missing} questions for topic '{topic}'")
+        generated = self.generator.generate_questions(question_type, topic, difficulty, missing)
+        fresh = [q for q in generated if not isinstance(q, BaseException)]
+
+        with self._lock:
+            reservoir = self._reservoirs.get(key)
+            if reservoir is None:
+                return
+            # Skip questions already waiting in the pool so one quiz never gets the same question twice
+            known = {q.question for q in reservoir}
+            for question in fresh:
+                if question.question not in known:
+                    reservoir.append(question)
+                    known.add(question.question)
+
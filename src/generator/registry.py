@@ -0,0 +1,100 @@
+"""
+Overall Purpose:
+---------------
+Process-wide registry of ready-to-use question generators.
+
+Building a generator creates the chat model, its pooled HTTP clients and (when enabled) the
+question cache and warm pool. That work happens once per (model, temperature) and every
+Streamlit rerun and session reuses the same object, so nothing is constructed on the quiz hot path.
+
+Importing this module is cheap: langchain and the LLM client are only imported when the first
+generator is built. `warm_up()` does that in a background thread when the app starts, so the
+first page renders immediately and the first quiz does not pay for it.
+"""
+
+import threading
+
+from src.config.settings import settings
+
+_generators = {}
+_generators_lock = threading.Lock()
+
+_warmup_thread = None
+_warmup_lock = threading.Lock()
+
+
+# Assemble the generator stack: LLM generator -> dedup -> question cache -> warm pool (-> quiz-level dedup)
+# -> request coalescing
+def _build_generator(model: str, temperature: float):
+    from src.llm.groq_client import get_groq_llm
+    from src.generator.question_generator import QuestionGenerator
+
+    generator = QuestionGenerator(llm=get_groq_llm(model, temperature))
+    cache = None
+
+    if settings.QUESTION_CACHE_ENABLED:
+        from src.cache.question_cache import get_question_cache
+        cache = get_question_cache()
+
+    if settings.DEDUP_ENABLED:
+        # Reject new questions that duplicate the quiz or the question bank, before they reach the cache
+        from src.generator.dedup import DedupQuestionGenerator
+        generator = DedupQuestionGenerator(generator, bank=cache)
+
+    if cache is not None:
+        # Serve repeated topics from the local question cache and only top up from the LLM
+        from src.generator.cached_generator import CachedQuestionGenerator
+        generator = CachedQuestionGenerator(generator, cache)
+
+    if settings.QUESTION_POOL_ENABLED:
+        # Take pre-generated questions from the warm pool and refill it in the background
+        from src.generator.question_pool import QuestionPool
+        generator = QuestionPool(generator).start()
+
+    if settings.DEDUP_ENABLED and (cache is not None or settings.QUESTION_POOL_ENABLED):
+        # A quiz mixing cached, pooled and new questions is checked once more as a whole
+        generator = DedupQuestionGenerator(generator)
+
+    if settings.COALESCE_ENABLED:
+        # Sessions asking for the same quiz at the same moment share one generation
+        from src.generator.coalescing import CoalescingQuestionGenerator
+        generator = CoalescingQuestionGenerator(generator)
+
+    return generator
+
+
+# Return the shared generator for the model/temperature, creating it on first use (thread-safe)
+def get_question_generator(model: str = None, temperature: float = None):
+    model = model or settings.MODEL_NAME
+    temperature = settings.TEMPERATURE if temperature is None else temperature
+    key = (model, temperature)
+
+    generator = _generators.get(key)
+    if generator is not None:
+        return generator
+
+    with _generators_lock:
+        if key not in _generators:
+            _generators[key] = _build_generator(model, temperature)
+        return _generators[key]
+
+
+def _warm_up():
+    try:
+        get_question_generator()
+    except Exception as e:
+        # The first quiz will build the generator again and show the error to the user
+        from src.common.logger import get_logger
+        get_logger("registry").error(f"Generator warm-up failed: {str(e)}")
+
+
+# Build the default generator in a background thread, once per process (no-op when disabled)
+def warm_up():
+    global _warmup_thread
+    if not settings.WARMUP_ON_START:
+        return None
+    with _warmup_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(target=_warm_up, name="generator-warmup", daemon=True)
+            _warmup_thread.start()
+        return _warmup_thread
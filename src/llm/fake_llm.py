@@ -0,0 +1,152 @@
+"""
+Overall Purpose:
+---------------
+A deterministic, offline stand-in for the Groq chat model, used by benchmarks and load tests.
+
+Here's what's happening:
+- `FakeChatModel` answers the app's prompts with valid MCQ, fill-in-the-blank or batch JSON.
+- Latency is drawn from a seeded log-normal distribution around a configurable median.
+- A configurable share of answers is malformed: some can be fixed by the local repair stage
+  (code fences, trailing commas, wrong answer case), some cannot (plain prose).
+- A configurable share of calls fails with a 429 rate-limit error carrying a retry-after hint.
+- Prompts can be plain text or chat messages. With JSON mode requested (`response_format`),
+  answers are always syntactically valid JSON, like the real provider's JSON mode: malformed
+  answers come back clean and unusable ones as JSON missing the required fields.
+- Responses carry token usage metadata like the real client.
+
+It exposes `invoke` and `ainvoke`, which is everything `QuestionGenerator` needs.
+"""
+
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+
+from src.prompts.token_counter import count_prompt_tokens, prompt_text
+
+_TOPIC_RE = re.compile(r"about (.+?)\.\n")
+_COUNT_RE = re.compile(r"Generate (\d+) different")
+_DIFFICULTY_RE = re.compile(r"Generate (?:a |\d+ different )(\w+) ")
+_SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "sa", "te", "vo", "zi", "pa", "do", "gu"]
+
+
+class FakeResponse:
+    def __init__(self, content: str, prompt_tokens: int, completion_tokens: int):
+        self.content = content
+        self.response_metadata = {
+            "token_usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            }
+        }
+
+
+class FakeRateLimitError(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limit reached, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class FakeChatModel:
+    def __init__(self, latency_ms: float = 300.0, latency_sigma: float = 0.3, malformed_rate: float = 0.0,
+                 unfixable_rate: float = 0.0, rate_limit_rate: float = 0.0, retry_after: float = 0.05, seed: int = 42):
+        self.latency_ms = latency_ms  # Median latency of one call
+        self.latency_sigma = latency_sigma  # Spread of the log-normal latency distribution
+        self.malformed_rate = malformed_rate  # Share of answers the repair stage can fix
+        self.unfixable_rate = unfixable_rate  # Share of answers that force a re-prompt
+        self.rate_limit_rate = rate_limit_rate  # Share of calls rejected with a 429
+        self.retry_after = retry_after
+
+        self.calls = 0
+        self.rate_limited = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counter = 0
+
+    # Draw every random decision for one call up front (under a lock so runs are reproducible)
+    def _plan(self):
+        with self._lock:
+            self.calls += 1
+            latency = self.latency_ms / 1000.0 * math.exp(self._random.gauss(0, self.latency_sigma))
+            roll = self._random.random()
+            if roll < self.rate_limit_rate:
+                self.rate_limited += 1
+                return latency, "rate_limit", 0
+            roll = self._random.random()
+            if roll < self.unfixable_rate:
+                outcome = "unfixable"
+            elif roll < self.unfixable_rate + self.malformed_rate:
+                outcome = "malformed"
+            else:
+                outcome = "valid"
+            self._counter += 1
+            return latency, outcome, self._counter
+
+    def invoke(self, prompt, **kwargs) -> FakeResponse:
+        latency, outcome, number = self._plan()
+        time.sleep(latency)
+        return self._respond(prompt, outcome, number, kwargs.get("response_format"))
+
+    async def ainvoke(self, prompt, **kwargs) -> FakeResponse:
+        latency, outcome, number = self._plan()
+        await asyncio.sleep(latency)
+        return self._respond(prompt, outcome, number, kwargs.get("response_format"))
+
+    def _respond(self, messages, outcome: str, number: int, response_format: dict = None) -> FakeResponse:
+        if outcome == "rate_limit":
+            raise FakeRateLimitError(self.retry_after)
+
+        prompt = prompt_text(messages)
+        topic_match = _TOPIC_RE.search(prompt)
+        topic = topic_match.group(1) if topic_match else "general knowledge"
+        difficulty_match = _DIFFICULTY_RE.search(prompt)
+        difficulty = difficulty_match.group(1) if difficulty_match else "medium"
+        is_mcq = "multiple-choice" in prompt
+
+        count_match = _COUNT_RE.search(prompt)
+        if count_match:
+            items = [self._item(is_mcq, topic, difficulty, f"{number}.{i}") for i in range(int(count_match.group(1)))]
+            payload = {"questions": items}
+        else:
+            payload = self._item(is_mcq, topic, difficulty, str(number))
+
+        json_mode = (response_format or {}).get("type") == "json_object"
+        if outcome == "unfixable" and json_mode:
+            content = json.dumps({"question": f"Here is a great question about {topic}!"})
+        elif outcome == "unfixable":
+            content = f"Here is a great question about {topic} for you to think about!"
+        elif outcome == "malformed" and not json_mode:
+            # Wrapped in a code fence with a trailing comma: invalid JSON the repair stage can fix
+            content = "```json\n" + json.dumps(payload, indent=2)[:-1].rstrip() + ",\n}\n```"
+        else:
+            content = json.dumps(payload)
+
+        return FakeResponse(content, prompt_tokens=count_prompt_tokens(messages), completion_tokens=len(content) // 4)
+
+    # Made-up words derived from the question number, so different questions read differently
+    # (and are not rejected as near-duplicates of each other)
+    @staticmethod
+    def _words(number: str, count: int) -> list:
+        rng = random.Random(number)
+        return ["".join(rng.choice(_SYLLABLES) for _ in range(3)) for _ in range(count)]
+
+    @classmethod
+    def _item(cls, is_mcq: bool, topic: str, difficulty: str, number: str) -> dict:
+        first, second, third = cls._words(number, 3)
+        if is_mcq:
+            options = [f"Answer {number}-{letter}" for letter in "ABCD"]
+            return {
+                "question": f"{difficulty.capitalize()} question {number} about {topic}: which {first} {second} {third}?",
+                "options": options,
+                "correct_answer": options[int(number.split(".")[-1]) % 4],
+            }
+        return {
+            "question": f"{difficulty.capitalize()} fact {number} about {topic}: {first} {second} is _____.",
+            "answer": third,
+        }
@@ -1,9 +1,68 @@
-from langchain_groq import ChatGroq
+import threading
+
 from src.config.settings import settings
 
-def get_groq_llm():
+# One chat model per (model, temperature), shared by every quiz session in this process
+_llm_cache = {}
+_llm_lock = threading.Lock()
+
+
+# Keep-alive connection limits shared by the sync and async HTTP clients
+def _http_limits():
+    import httpx
+
+    return httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+# Create one chat model for a provider ("groq" or "fake")
+def create_llm(provider: str, model: str, temperature: float):
+    if provider == "fake":
+        # Offline fake model, so the whole app can run without spending Groq quota
+        from src.llm.fake_llm import FakeChatModel
+        latency_ms = float(model) if model.replace(".", "", 1).isdigit() else settings.FAKE_LLM_LATENCY_MS
+        return FakeChatModel(latency_ms=latency_ms)
+    if provider != "groq":
+        raise ValueError(f"Unknown LLM provider '{provider}'")
+
+    # Imported here so the app (and the fake provider) start without loading the Groq stack
+    import httpx
+    from langchain_groq import ChatGroq
+
     return ChatGroq(
         api_key=settings.GROQ_API_KEY,
-        model=settings.MODEL_NAME,
-        temperature=settings.TEMPERATURE
+        model=model,
+        temperature=temperature,
+        # Retries and backoff are handled by QuestionGenerator and the shared rate limiter
+        max_retries=0,
+        # Pooled HTTP clients so connections are reused across questions and sessions
+        http_client=httpx.Client(limits=_http_limits(), timeout=settings.HTTP_TIMEOUT),
+        http_async_client=httpx.AsyncClient(limits=_http_limits(), timeout=settings.HTTP_TIMEOUT),
     )
+
+
+# Shared chat model for the model/temperature; with LLM_BACKENDS configured, a router over those backends
+def get_groq_llm(model: str = None, temperature: float = None):
+    model = model or settings.MODEL_NAME
+    temperature = settings.TEMPERATURE if temperature is None else temperature
+    key = (model, temperature)
+
+    llm = _llm_cache.get(key)
+    if llm is not None:
+        return llm
+
+    with _llm_lock:
+        # Another thread may have created the client while we were waiting for the lock
+        if key in _llm_cache:
+            return _llm_cache[key]
+
+        if settings.LLM_BACKENDS:
+            # Route each call to the fastest healthy backend (the backends name their own models)
+            from src.llm.router import build_router
+            _llm_cache[key] = build_router(settings.LLM_BACKENDS, temperature)
+        else:
+            _llm_cache[key] = create_llm(settings.LLM_PROVIDER, model, temperature)
+        return _llm_cache[key]
@@ -0,0 +1,196 @@
+"""
+Overall Purpose:
+---------------
+Client-side rate limiting and retry backoff for LLM calls.
+
+Here's what's happening:
+- `RateLimiter` combines two token buckets: requests per minute and (estimated) LLM tokens
+  per minute. Every LLM call reserves capacity first and waits if the budget is used up.
+- When the provider answers with a 429, the limiter pauses all callers until the retry-after
+  hint has passed, so other sessions stop hammering the provider too.
+- `backoff_delay` computes exponential backoff with full jitter, honoring retry-after hints.
+- `is_transient_error` separates failures worth retrying (429, timeouts, 5xx, dropped
+  connections) from failures that will never succeed (bad API key, bad request).
+
+The limiter works from both sync and async code, and its clock and sleep functions can be
+replaced so it can be driven by a fake LLM without real waiting.
+"""
+
+import asyncio
+import random
+import threading
+import time
+
+from src.config.settings import settings
+from src.prompts.token_counter import count_prompt_tokens
+
+# HTTP status codes that are worth retrying after a delay
+TRANSIENT_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    def __init__(self, rate_per_minute: float, capacity: float = None, clock=time.monotonic):
+        self.rate = rate_per_minute / 60.0  # Units added back per second
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.clock = clock
+        self.available = self.capacity
+        self.updated = clock()
+
+    # Take `amount` units now and return how long the caller must wait before using them.
+    # The balance may go negative, which queues later callers behind this one.
+    def reserve(self, amount: float) -> float:
+        self._refill()
+
+        # A single request larger than the bucket can never fit, so only wait for a full bucket
+        amount = min(amount, self.capacity)
+        self.available -= amount
+        if self.available >= 0:
+            return 0.0
+        return -self.available / self.rate
+
+    # Whether `amount` units are available right now (without taking them)
+    def has(self, amount: float) -> bool:
+        self._refill()
+        return self.available >= min(amount, self.capacity)
+
+    def _refill(self):
+        now = self.clock()
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class RateLimiter:
+    def __init__(self, requests_per_minute: float = None, tokens_per_minute: float = None,
+                 clock=time.monotonic, sleep=time.sleep, async_sleep=asyncio.sleep):
+        requests_per_minute = settings.RATE_LIMIT_REQUESTS_PER_MINUTE if requests_per_minute is None else requests_per_minute
+        tokens_per_minute = settings.RATE_LIMIT_TOKENS_PER_MINUTE if tokens_per_minute is None else tokens_per_minute
+
+        # A limit of 0 disables that bucket
+        self.request_bucket = TokenBucket(requests_per_minute, clock=clock) if requests_per_minute > 0 else None
+        self.token_bucket = TokenBucket(tokens_per_minute, clock=clock) if tokens_per_minute > 0 else None
+
+        self.clock = clock
+        self.sleep = sleep
+        self.async_sleep = async_sleep
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    # Reserve one request and `tokens` tokens; returns the number of seconds to wait
+    def _reserve(self, tokens: int) -> float:
+        with self._lock:
+            wait = max(0.0, self._paused_until - self.clock())
+            if self.request_bucket:
+                wait = max(wait, self.request_bucket.reserve(1))
+            if self.token_bucket:
+                wait = max(wait, self.token_bucket.reserve(tokens))
+            return wait
+
+    # Block until the call is allowed (sync code paths)
+    def acquire(self, tokens: int = 0):
+        wait = self._reserve(tokens)
+        if wait > 0:
+            self.sleep(wait)
+
+    # Wait until the call is allowed without blocking the event loop (async code paths)
+    async def aacquire(self, tokens: int = 0):
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await self.async_sleep(wait)
+
+    # Reserve one request and `tokens` tokens only if that needs no waiting; returns whether it did
+    # (for optional calls, e.g. hedged requests, that should be skipped rather than delayed)
+    def try_acquire(self, tokens: int = 0) -> bool:
+        with self._lock:
+            if self._paused_until > self.clock():
+                return False
+            if self.request_bucket and not self.request_bucket.has(1):
+                return False
+            if self.token_bucket and not self.token_bucket.has(tokens):
+                return False
+            if self.request_bucket:
+                self.request_bucket.reserve(1)
+            if self.token_bucket:
+                self.token_bucket.reserve(tokens)
+            return True
+
+    # Stop every caller for `seconds` (used when the provider reports a rate limit)
+    def pause(self, seconds: float):
+        with self._lock:
+            self._paused_until = max(self._paused_until, self.clock() + seconds)
+
+
+# Estimated token count for a rendered prompt (text or chat messages) plus the expected completion
+def estimate_tokens(prompt, completion_tokens: int = None) -> int:
+    completion_tokens = settings.RATE_LIMIT_COMPLETION_TOKENS if completion_tokens is None else completion_tokens
+    return count_prompt_tokens(prompt) + completion_tokens
+
+
+# Walk the exception and the exceptions that caused it (LangChain often wraps provider errors)
+def _error_chain(error: BaseException):
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        error = error.__cause__ or error.__context__
+
+
+def _status_code(error: BaseException):
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+# Is this a failure that may succeed if we wait and try again?
+def is_transient_error(error: BaseException) -> bool:
+    for err in _error_chain(error):
+        status = _status_code(err)
+        if status is not None:
+            return status in TRANSIENT_STATUS_CODES
+        if isinstance(err, (TimeoutError, ConnectionError)):
+            return True
+        name = type(err).__name__
+        if any(word in name for word in ("Timeout", "Connection", "RateLimit")):
+            return True
+    return False
+
+
+# Is this the provider telling us we are over the rate limit?
+def is_rate_limit_error(error: BaseException) -> bool:
+    return any(_status_code(err) == 429 or "RateLimit" in type(err).__name__ for err in _error_chain(error))
+
+
+# Seconds the provider asked us to wait (from a `retry_after` attribute or a Retry-After header)
+def get_retry_after(error: BaseException):
+    for err in _error_chain(error):
+        value = getattr(err, "retry_after", None)
+        if value is None:
+            headers = getattr(getattr(err, "response", None), "headers", None) or {}
+            value = headers.get("retry-after")
+        if value is not None:
+            try:
+                return max(0.0, float(value))
+            except (TypeError, ValueError):
+                continue
+    return None
+
+
+# Exponential backoff with full jitter; a retry-after hint from the provider takes precedence
+def backoff_delay(attempt: int, retry_after: float = None) -> float:
+    if retry_after is not None:
+        return retry_after
+    ceiling = min(settings.BACKOFF_MAX_SECONDS, settings.BACKOFF_BASE_SECONDS * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+# Process-wide limiter shared by every generator, so all sessions stay inside one budget
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter()
+        return _rate_limiter
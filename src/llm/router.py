@@ -0,0 +1,307 @@
+"""
+Overall Purpose:
+---------------
+This module defines `ModelRouter`, a chat model that spreads requests over several backends
+(different Groq models, any LangChain chat model, or the offline fake model) and picks the
+fastest healthy one for each request.
+
+Here's what's happening:
+- Every backend keeps a rolling window of its latencies and outcomes (success or error).
+- Each request goes to the healthy backend with the lowest median latency; backends without
+  samples yet are tried first so every backend gets measured. A backend whose error rate over
+  the last `ROUTER_ERROR_WINDOW_SECONDS` is above `ROUTER_MAX_ERROR_RATE` is only used after
+  the healthy ones; as its old errors age out of that window it becomes healthy again.
+- If the chosen backend has not answered after its p95 latency, the request is hedged: the
+  next backend is called too and the first answer wins (at most one hedge per request).
+- An error fails over to the next backend straight away; only when every backend failed is
+  the last error raised (so `QuestionGenerator` can back off and retry as before).
+- Hedges and failovers are extra provider calls, so they go through the shared `RateLimiter`
+  too: a failover waits for the budget, a hedge is skipped when the budget is used up.
+- After `ROUTER_FAILURE_THRESHOLD` consecutive failures a backend's circuit opens and it gets
+  no traffic for `ROUTER_COOLDOWN_SECONDS`; after that one request tries it again (a failure
+  re-opens the circuit, a success closes it and clears the backend's error history).
+
+The router exposes `invoke` and `ainvoke` like the chat models it wraps, so it can replace the
+single client returned by `get_groq_llm` (see `LLM_BACKENDS` in `Settings`).
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from src.config.settings import settings
+from src.common.logger import get_logger
+from src.common.metrics import counter, histogram
+from src.llm.rate_limiter import estimate_tokens, get_rate_limiter
+
+ROUTER_CALLS = counter("quiz_llm_router_calls_total", "LLM calls made by the model router", ["backend", "outcome"])
+ROUTER_HEDGES = counter("quiz_llm_router_hedges_total", "Requests hedged to a second backend", ["backend"])
+ROUTER_HEDGES_SKIPPED = counter("quiz_llm_router_hedges_skipped_total", "Hedges skipped because the rate limit budget was used up", ["backend"])
+ROUTER_CIRCUIT_OPENS = counter("quiz_llm_router_circuit_opens_total", "Times a backend's circuit was opened", ["backend"])
+ROUTER_LATENCY = histogram("quiz_llm_router_latency_seconds", "Latency of successful calls per backend", ["backend"])
+
+
+def _percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct * len(ordered)) - 1))]
+
+
+class Backend:
+    def __init__(self, name: str, llm, window: int = None):
+        self.name = name
+        self.llm = llm  # Anything with invoke/ainvoke (ChatGroq, another LangChain chat model, FakeChatModel)
+        window = window or settings.ROUTER_WINDOW
+        self.latencies = deque(maxlen=window)  # Seconds, successful calls only
+        self.outcomes = deque(maxlen=window)  # (time, True for a success / False for an error)
+        self.consecutive_failures = 0
+        # Circuit is open (no traffic) until this time; it stays set after the cooldown (half-open)
+        # until a probe request succeeds
+        self.open_until = 0.0
+        self.probing = False  # The half-open probe request is in flight
+
+    def latency(self, quantile: float):
+        return _percentile(self.latencies, quantile) if self.latencies else None
+
+    # Share of errors among the calls of the last `horizon` seconds
+    def error_rate(self, now: float, horizon: float) -> float:
+        recent = [ok for at, ok in self.outcomes if at >= now - horizon]
+        return recent.count(False) / len(recent) if recent else 0.0
+
+    def stats(self, now: float, horizon: float) -> dict:
+        return {
+            "name": self.name,
+            "recent_calls": len(self.outcomes),
+            "latency_p50": self.latency(0.5),
+            "latency_p95": self.latency(0.95),
+            "error_rate": self.error_rate(now, horizon),
+            "circuit_open": self.open_until > now,
+            "half_open": bool(self.open_until) and self.open_until <= now,
+        }
+
+
+class ModelRouter:
+    def __init__(self, backends: list, hedge: bool = None, hedge_quantile: float = None,
+                 hedge_default_delay: float = None, min_samples: int = None, max_error_rate: float = None,
+                 failure_threshold: int = None, cooldown_seconds: float = None, error_window_seconds: float = None,
+                 rate_limiter=None, clock=time.monotonic):
+        if not backends:
+            raise ValueError("ModelRouter needs at least one backend")
+        self.backends = list(backends)
+        self.hedge = hedge if hedge is not None else settings.ROUTER_HEDGE_ENABLED
+        self.hedge_quantile = hedge_quantile if hedge_quantile is not None else settings.ROUTER_HEDGE_QUANTILE
+        self.hedge_default_delay = hedge_default_delay if hedge_default_delay is not None else settings.ROUTER_HEDGE_DEFAULT_DELAY
+        self.min_samples = min_samples if min_samples is not None else settings.ROUTER_MIN_SAMPLES
+        self.max_error_rate = max_error_rate if max_error_rate is not None else settings.ROUTER_MAX_ERROR_RATE
+        self.failure_threshold = failure_threshold if failure_threshold is not None else settings.ROUTER_FAILURE_THRESHOLD
+        self.cooldown_seconds = cooldown_seconds if cooldown_seconds is not None else settings.ROUTER_COOLDOWN_SECONDS
+        self.error_window_seconds = error_window_seconds if error_window_seconds is not None else settings.ROUTER_ERROR_WINDOW_SECONDS
+        self.rate_limiter = rate_limiter or get_rate_limiter()  # Budget shared with QuestionGenerator
+        self.clock = clock
+        self.logger = get_logger(self.__class__.__name__)
+
+        self._lock = threading.Lock()
+        # Sync calls run here so the caller can wait for whichever backend answers first
+        self._executor = ThreadPoolExecutor(max_workers=settings.ROUTER_MAX_WORKERS, thread_name_prefix="llm-router")
+
+    # Backends in the order to try them: a due circuit probe, healthy ones by median latency, then the rest
+    def _ranked(self) -> list:
+        now = self.clock()
+        with self._lock:
+            # A backend whose cooldown has passed gets one probe request (the rest of its traffic waits for the outcome)
+            probe = next((b for b in self.backends if b.open_until and b.open_until <= now and not b.probing), None)
+            if probe is not None:
+                probe.probing = True
+
+            available = [b for b in self.backends if not b.open_until]
+            if probe is None and not available:
+                # Every circuit is open: try the backend that would reopen first rather than fail outright
+                return sorted(self.backends, key=lambda b: b.open_until)
+
+            def speed(backend):
+                latency = backend.latency(0.5)
+                return 0.0 if latency is None else latency
+
+            def degraded(backend):
+                return backend.error_rate(now, self.error_window_seconds) > self.max_error_rate
+
+            ranked = sorted((b for b in available if not degraded(b)), key=speed)
+            ranked += sorted((b for b in available if degraded(b)), key=speed)
+            return ([probe] if probe is not None else []) + ranked
+
+    # How long to wait for a backend before hedging: its p95 latency once it has enough samples
+    def _hedge_delay(self, backend: Backend) -> float:
+        with self._lock:
+            if len(backend.latencies) < self.min_samples:
+                return self.hedge_default_delay
+            return backend.latency(self.hedge_quantile)
+
+    def _record(self, backend: Backend, latency: float = None, error: Exception = None):
+        with self._lock:
+            now = self.clock()
+            if error is None:
+                backend.latencies.append(latency)
+                backend.consecutive_failures = 0
+                if backend.open_until:
+                    # The backend answers again: close the circuit and forget the errors of the outage
+                    backend.open_until = 0.0
+                    backend.probing = False
+                    backend.outcomes.clear()
+                    self.logger.info(f"Circuit closed for backend '{backend.name}'")
+                backend.outcomes.append((now, True))
+            else:
+                backend.outcomes.append((now, False))
+                backend.consecutive_failures += 1
+                if backend.probing or backend.consecutive_failures >= self.failure_threshold:
+                    backend.probing = False
+                    backend.open_until = now + self.cooldown_seconds
+                    ROUTER_CIRCUIT_OPENS.inc(backend=backend.name)
+                    self.logger.warning(
+                        f"Circuit opened for backend '{backend.name}' after {backend.consecutive_failures} "
+                        f"consecutive failures: {str(error)}"
+                    )
+        if error is None:
+            ROUTER_CALLS.inc(backend=backend.name, outcome="success")
+            ROUTER_LATENCY.observe(latency, backend=backend.name)
+        else:
+            ROUTER_CALLS.inc(backend=backend.name, outcome="error")
+
+    # A call that never finished (cancelled) gives its probe back, so the next request probes again
+    def _abandon(self, backend: Backend):
+        with self._lock:
+            backend.probing = False
+
+    def _call(self, backend: Backend, prompt, kwargs):
+        start = time.perf_counter()
+        try:
+            response = backend.llm.invoke(prompt, **kwargs)
+        except Exception as e:
+            self._record(backend, error=e)
+            raise
+        self._record(backend, latency=time.perf_counter() - start)
+        return response
+
+    async def _acall(self, backend: Backend, prompt, kwargs):
+        start = time.perf_counter()
+        try:
+            response = await backend.llm.ainvoke(prompt, **kwargs)
+        except asyncio.CancelledError:
+            self._abandon(backend)
+            raise
+        except Exception as e:
+            # (A hedge cancelled because the other backend won raises CancelledError, which is not counted)
+            self._record(backend, error=e)
+            raise
+        self._record(backend, latency=time.perf_counter() - start)
+        return response
+
+    # Hedge the in-flight call if the rate limit budget allows another call right now
+    def _try_hedge(self, in_flight: Backend, tokens: int) -> bool:
+        if not self.rate_limiter.try_acquire(tokens):
+            ROUTER_HEDGES_SKIPPED.inc(backend=in_flight.name)
+            return False
+        ROUTER_HEDGES.inc(backend=in_flight.name)
+        return True
+
+    def invoke(self, prompt, **kwargs):
+        candidates = self._ranked()
+        tokens = estimate_tokens(prompt)
+        pending = {}
+        hedged = False
+        last_error = None
+
+        def launch():
+            backend = candidates.pop(0)
+            pending[self._executor.submit(self._call, backend, prompt, kwargs)] = backend
+
+        # The first call was already counted against the rate limit by the caller
+        launch()
+        try:
+            while pending:
+                in_flight = next(iter(pending.values()))
+                can_hedge = self.hedge and not hedged and candidates
+                done, _ = wait(pending, timeout=self._hedge_delay(in_flight) if can_hedge else None,
+                               return_when=FIRST_COMPLETED)
+                if not done:
+                    # Slower than usual: ask the next backend too and take whichever answers first
+                    hedged = True
+                    if self._try_hedge(in_flight, tokens):
+                        launch()
+                    continue
+
+                for future in done:
+                    pending.pop(future)
+                    try:
+                        return future.result()
+                    except Exception as e:
+                        last_error = e
+
+                # Fail over to the next backend as soon as nothing is left in flight
+                if not pending and candidates:
+                    self.rate_limiter.acquire(tokens)
+                    launch()
+        finally:
+            # Calls still queued are dropped; one already running finishes in the background
+            for future, backend in pending.items():
+                if future.cancel():
+                    self._abandon(backend)
+        raise last_error
+
+    async def ainvoke(self, prompt, **kwargs):
+        candidates = self._ranked()
+        tokens = estimate_tokens(prompt)
+        pending = {}
+        hedged = False
+        last_error = None
+
+        def launch():
+            backend = candidates.pop(0)
+            pending[asyncio.ensure_future(self._acall(backend, prompt, kwargs))] = backend
+
+        launch()
+        try:
+            while pending:
+                in_flight = next(iter(pending.values()))
+                can_hedge = self.hedge and not hedged and candidates
+                done, _ = await asyncio.wait(pending, timeout=self._hedge_delay(in_flight) if can_hedge else None,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    if self._try_hedge(in_flight, tokens):
+                        launch()
+                    continue
+
+                for task in done:
+                    pending.pop(task)
+                    try:
+                        return task.result()
+                    except Exception as e:
+                        last_error = e
+
+                if not pending and candidates:
+                    await self.rate_limiter.aacquire(tokens)
+                    launch()
+        finally:
+            # The losing hedge (or everything, if the caller was cancelled) is cancelled
+            for task in pending:
+                task.cancel()
+        raise last_error
+
+    # Rolling latency, error rate and circuit state of every backend
+    def stats(self) -> list:
+        now = self.clock()
+        with self._lock:
+            return [backend.stats(now, self.error_window_seconds) for backend in self.backends]
+
+
+# Build a router from "provider:model" specs such as "groq:llama-3.1-8b-instant" or "fake:200"
+# (for the fake provider the part after the colon is its median latency in milliseconds)
+def build_router(specs: list, temperature: float) -> ModelRouter:
+    from src.llm.groq_client import create_llm
+
+    backends = []
+    for spec in specs:
+        provider, _, model = spec.partition(":")
+        backends.append(Backend(spec, create_llm(provider.strip().lower(), model.strip() or settings.MODEL_NAME, temperature)))
+    return ModelRouter(backends)
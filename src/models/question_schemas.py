@@ -39,3 +39,14 @@ class FillBlankQuestion(BaseModel):
         if isinstance(v, dict):
             return v.get('description', str(v))
         return str(v)
+
+# -----------------------------
+# Models for batch generation (several questions in one LLM call)
+# -----------------------------
+class MCQBatch(BaseModel):
+    # A list of MCQ questions returned by a single batch prompt
+    questions: List[MCQQuestion] = Field(description="List of multiple choice questions")
+
+class FillBlankBatch(BaseModel):
+    # A list of Fill-in-the-Blank questions returned by a single batch prompt
+    questions: List[FillBlankQuestion] = Field(description="List of fill-in-the-blank questions")
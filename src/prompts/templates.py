@@ -1,5 +1,7 @@
 from langchain.prompts import PromptTemplate
 
+from src.config.settings import settings
+
 mcq_prompt_template = PromptTemplate(
     template=(
         "Generate a {difficulty} multiple-choice question about {topic}.\n\n"
@@ -33,3 +35,132 @@ fill_blank_prompt_template = PromptTemplate(
     ),
     input_variables=["topic", "difficulty"]
 )
+
+mcq_batch_prompt_template = PromptTemplate(
+    template=(
+        "Generate {count} different {difficulty} multiple-choice questions about {topic}.\n\n"
+        "Return ONLY a JSON object with a 'questions' field holding an array of {count} objects.\n"
+        "Each object must have these exact fields:\n"
+        "- 'question': A clear, specific question\n"
+        "- 'options': An array of exactly 4 possible answers\n"
+        "- 'correct_answer': One of the options that is the correct answer\n\n"
+        "Example format:\n"
+        '{{\n'
+        '    "questions": [\n'
+        '        {{\n'
+        '            "question": "What is the capital of France?",\n'
+        '            "options": ["London", "Berlin", "Paris", "Madrid"],\n'
+        '            "correct_answer": "Paris"\n'
+        '        }}\n'
+        '    ]\n'
+        '}}\n\n'
+        "Your response:"
+    ),
+    input_variables=["topic", "difficulty", "count"]
+)
+
+fill_blank_batch_prompt_template = PromptTemplate(
+    template=(
+        "Generate {count} different {difficulty} fill-in-the-blank questions about {topic}.\n\n"
+        "Return ONLY a JSON object with a 'questions' field holding an array of {count} objects.\n"
+        "Each object must have these exact fields:\n"
+        "- 'question': A sentence with '_____' marking where the blank should be\n"
+        "- 'answer': The correct word or phrase that belongs in the blank\n\n"
+        "Example format:\n"
+        '{{\n'
+        '    "questions": [\n'
+        '        {{\n'
+        '            "question": "The capital of France is _____.",\n'
+        '            "answer": "Paris"\n'
+        '        }}\n'
+        '    ]\n'
+        '}}\n\n'
+        "Your response:"
+    ),
+    input_variables=["topic", "difficulty", "count"]
+)
+
+# -----------------------------
+# Compact variant: the instructions live in one shared system message and each prompt only
+# carries a minimal description of the JSON shape (no worked example)
+# -----------------------------
+COMPACT_SYSTEM_MESSAGE = (
+    "You write quiz questions. Reply with one JSON object in exactly the shape given, "
+    "with no other text."
+)
+
+_MCQ_SHAPE = '{{"question": str, "options": [4 str], "correct_answer": str (one of options)}}'
+_FILL_BLANK_SHAPE = '{{"question": str with "_____" for the blank, "answer": str}}'
+
+compact_mcq_prompt_template = PromptTemplate(
+    template="Generate a {difficulty} multiple-choice question about {topic}.\nJSON: " + _MCQ_SHAPE,
+    input_variables=["topic", "difficulty"]
+)
+
+compact_fill_blank_prompt_template = PromptTemplate(
+    template="Generate a {difficulty} fill-in-the-blank question about {topic}.\nJSON: " + _FILL_BLANK_SHAPE,
+    input_variables=["topic", "difficulty"]
+)
+
+compact_mcq_batch_prompt_template = PromptTemplate(
+    template=(
+        "Generate {count} different {difficulty} multiple-choice questions about {topic}.\n"
+        'JSON: {{"questions": [{count} x ' + _MCQ_SHAPE + "]}}"
+    ),
+    input_variables=["topic", "difficulty", "count"]
+)
+
+compact_fill_blank_batch_prompt_template = PromptTemplate(
+    template=(
+        "Generate {count} different {difficulty} fill-in-the-blank questions about {topic}.\n"
+        'JSON: {{"questions": [{count} x ' + _FILL_BLANK_SHAPE + "]}}"
+    ),
+    input_variables=["topic", "difficulty", "count"]
+)
+
+
+# -----------------------------
+# Prompt variants (selected with Settings.PROMPT_VARIANT)
+# -----------------------------
+class PromptSet:
+    def __init__(self, name: str, mcq, fill_blank, mcq_batch, fill_blank_batch, system: str = None):
+        self.name = name
+        self.mcq = mcq
+        self.fill_blank = fill_blank
+        self.mcq_batch = mcq_batch
+        self.fill_blank_batch = fill_blank_batch
+        self.system = system  # Shared system message, or None to send the prompt on its own
+
+    # Single and batch templates for a question type (keys match the UI labels)
+    def templates(self, question_type: str) -> tuple:
+        return {
+            "Multiple Choice": (self.mcq, self.mcq_batch),
+            "Fill in the Blank": (self.fill_blank, self.fill_blank_batch),
+        }.get(question_type, ())
+
+    # Fill in a template; with a system message the result is a list of chat messages
+    def render(self, template, **values):
+        text = template.format(**values)
+        if self.system:
+            return [("system", self.system), ("human", text)]
+        return text
+
+
+PROMPT_VARIANTS = {
+    "verbose": PromptSet(
+        "verbose", mcq_prompt_template, fill_blank_prompt_template,
+        mcq_batch_prompt_template, fill_blank_batch_prompt_template,
+    ),
+    "compact": PromptSet(
+        "compact", compact_mcq_prompt_template, compact_fill_blank_prompt_template,
+        compact_mcq_batch_prompt_template, compact_fill_blank_batch_prompt_template,
+        system=COMPACT_SYSTEM_MESSAGE,
+    ),
+}
+
+
+def get_prompt_set(variant: str = None) -> PromptSet:
+    variant = variant or settings.PROMPT_VARIANT
+    if variant not in PROMPT_VARIANTS:
+        raise ValueError(f"Unknown prompt variant '{variant}' (expected one of {', '.join(PROMPT_VARIANTS)})")
+    return PROMPT_VARIANTS[variant]
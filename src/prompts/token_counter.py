@@ -0,0 +1,51 @@
+"""
+Overall Purpose:
+---------------
+Offline token counting for rendered prompts, without loading a tokenizer.
+
+Here's what's happening:
+- Text is split like a BPE tokenizer roughly would: short words are one token, long words and
+  identifiers are split every few characters, and runs of punctuation (JSON braces, quotes,
+  commas) take about one token per two characters.
+- A prompt can be a plain string or a list of chat messages ((role, content) pairs); every
+  message adds a few tokens for its role header.
+
+The count is an estimate used for the rate limiter budget, the prompt size metric and the
+prompt comparison report; the token usage reported by the LLM stays the exact figure.
+"""
+
+import re
+
+_PIECE_RE = re.compile(r"\w+|[^\w\s]+|\n+")
+
+# Characters per token for word pieces and for punctuation runs
+_WORD_CHARS = 8
+_PUNCTUATION_CHARS = 2
+
+# Role header and separators added around every chat message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def count_tokens(text: str) -> int:
+    total = 0
+    for piece in _PIECE_RE.findall(text):
+        if piece[0] == "\n":
+            total += 1
+        else:
+            size = _WORD_CHARS if piece[0].isalnum() or piece[0] == "_" else _PUNCTUATION_CHARS
+            total += -(-len(piece) // size)
+    return total
+
+
+# Tokens of a rendered prompt: a string, or chat messages as (role, content) pairs
+def count_prompt_tokens(prompt) -> int:
+    if isinstance(prompt, str):
+        return count_tokens(prompt)
+    return sum(count_tokens(content) + MESSAGE_OVERHEAD_TOKENS for _, content in prompt)
+
+
+# The text of a rendered prompt (all message contents joined), e.g. for logs or the fake model
+def prompt_text(prompt) -> str:
+    if isinstance(prompt, str):
+        return prompt
+    return "\n".join(content for _, content in prompt)
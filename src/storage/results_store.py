@@ -0,0 +1,247 @@
+"""
+Overall Purpose:
+---------------
+This module defines `ResultsStore`, an append-only SQLite store of every submitted quiz,
+replacing the one-CSV-file-per-quiz history under `results/`.
+
+Here's what's happening:
+- Each answered question is one row of the `results` table, partitioned by `quiz_date` and
+  `topic` (both indexed), with the difficulty and question type alongside.
+- MCQ options are stored as a real list: one row per option in the `result_options` child
+  table, in their original order.
+- Rows are only ever inserted. They are buffered in memory and written in one transaction
+  every `RESULTS_FLUSH_ROWS` rows or at most `RESULTS_FLUSH_INTERVAL` seconds after they were
+  appended (a background timer flushes a quiet store, so a killed pod loses at most that much).
+- `accuracy()` computes per-topic / per-difficulty accuracy over the whole history with a SQL
+  aggregate, so nothing is loaded into memory.
+- `export_csv()` builds the CSV of a quiz from the store on demand (for the download button).
+
+SQLite is used rather than Parquet so the store needs no extra dependency.
+"""
+
+import atexit
+import ast
+import csv
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from src.config.settings import settings
+from src.common.logger import get_logger
+
+# Columns of the exported CSV (same layout as the old per-quiz CSV files)
+CSV_COLUMNS = ["question_number", "question", "question_type", "user_answer", "correct_answer", "is_correct", "options"]
+
+# Columns accuracy can be grouped by
+GROUP_COLUMNS = {"topic", "difficulty", "question_type", "quiz_date"}
+
+
+class ResultsStore:
+    def __init__(self, path: str = None, flush_rows: int = None, flush_interval: float = None):
+        self.path = path or settings.RESULTS_STORE_PATH
+        self.flush_rows = flush_rows if flush_rows is not None else settings.RESULTS_FLUSH_ROWS
+        self.flush_interval = flush_interval if flush_interval is not None else settings.RESULTS_FLUSH_INTERVAL
+        self.logger = get_logger(self.__class__.__name__)
+
+        # Rows waiting to be written: (result row, options)
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._timer = None  # Pending background flush for rows that are not due yet
+
+        # One shared connection guarded by a lock, so the store can be used from several Streamlit sessions
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " quiz_id TEXT NOT NULL,"
+            " quiz_date TEXT NOT NULL,"
+            " topic TEXT NOT NULL,"
+            " difficulty TEXT NOT NULL,"
+            " question_type TEXT NOT NULL,"
+            " question_number INTEGER NOT NULL,"
+            " question TEXT NOT NULL,"
+            " user_answer TEXT,"
+            " correct_answer TEXT NOT NULL,"
+            " is_correct INTEGER NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS result_options ("
+            " result_id INTEGER NOT NULL REFERENCES results (id),"
+            " position INTEGER NOT NULL,"
+            " option TEXT NOT NULL,"
+            " PRIMARY KEY (result_id, position))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_partition ON results (quiz_date, topic)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_quiz ON results (quiz_id)")
+        self._conn.commit()
+
+    # Queue the evaluated results of one quiz; returns the quiz id used to export it later
+    def append(self, results: list, topic: str, difficulty: str, quiz_id: str = None, created_at: float = None) -> str:
+        quiz_id = quiz_id or uuid.uuid4().hex
+        created_at = created_at or time.time()
+        quiz_date = datetime.fromtimestamp(created_at).strftime('%Y-%m-%d')
+        topic = " ".join(topic.lower().split())
+
+        rows = [
+            ((quiz_id, quiz_date, topic, difficulty.lower(), r['question_type'], r['question_number'], r['question'],
+              r['user_answer'], r['correct_answer'], int(bool(r['is_correct'])), created_at), r.get('options') or [])
+            for r in results
+        ]
+        with self._lock:
+            self._buffer.extend(rows)
+            waited = time.monotonic() - self._last_flush
+            due = len(self._buffer) >= self.flush_rows or waited >= self.flush_interval
+            if not due and self._timer is None:
+                # Nothing else may be appended for a while: write these rows when the interval is up anyway
+                self._timer = threading.Timer(self.flush_interval - waited, self._timed_flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if due:
+            self.flush()
+        return quiz_id
+
+    def _timed_flush(self):
+        try:
+            self.flush()
+        except Exception as e:
+            self.logger.error(f"Background flush of quiz results failed: {str(e)}")
+
+    # Write every buffered row in a single transaction
+    def flush(self):
+        with self._lock:
+            if self._buffer:
+                with self._conn:
+                    for row, options in self._buffer:
+                        result_id = self._conn.execute(
+                            "INSERT INTO results (quiz_id, quiz_date, topic, difficulty, question_type, question_number,"
+                            " question, user_answer, correct_answer, is_correct, created_at)"
+                            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            row,
+                        ).lastrowid
+                        self._conn.executemany(
+                            "INSERT INTO result_options (result_id, position, option) VALUES (?, ?, ?)",
+                            [(result_id, position, str(option)) for position, option in enumerate(options)],
+                        )
+                self.logger.info(f"Flushed {len(self._buffer)} quiz results to the results store")
+                self._buffer = []
+            self._last_flush = time.monotonic()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    # Accuracy over the whole history (optionally within a date range), grouped by topic, difficulty, etc.
+    def accuracy(self, by=("topic",), since: str = None, until: str = None) -> list:
+        by = (by,) if isinstance(by, str) else tuple(by)
+        unknown = set(by) - GROUP_COLUMNS
+        if unknown:
+            raise ValueError(f"Cannot group accuracy by {', '.join(sorted(unknown))}")
+
+        conditions, params = [], []
+        if since:
+            conditions.append("quiz_date >= ?")
+            params.append(since)
+        if until:
+            conditions.append("quiz_date <= ?")
+            params.append(until)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        columns = ", ".join(by)
+
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {columns}, COUNT(*), SUM(is_correct), COUNT(DISTINCT quiz_id) FROM results{where}"
+                f" GROUP BY {columns} ORDER BY {columns}",
+                params,
+            ).fetchall()
+
+        return [
+            {
+                **dict(zip(by, row[:len(by)])),
+                "answered": row[-3],
+                "correct": row[-2],
+                "quizzes": row[-1],
+                "accuracy": row[-2] / row[-3] if row[-3] else 0.0,
+            }
+            for row in rows
+        ]
+
+    # Rows of one quiz in question order, with `options` as a list
+    def quiz_results(self, quiz_id: str) -> list:
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT r.id, r.question_number, r.question, r.question_type, r.user_answer, r.correct_answer,"
+                " r.is_correct, o.option FROM results r LEFT JOIN result_options o ON o.result_id = r.id"
+                " WHERE r.quiz_id = ? ORDER BY r.question_number, o.position",
+                (quiz_id,),
+            ).fetchall()
+
+        results = {}
+        for result_id, number, question, question_type, user_answer, correct_answer, is_correct, option in rows:
+            if result_id not in results:
+                results[result_id] = {
+                    'question_number': number,
+                    'question': question,
+                    'question_type': question_type,
+                    'user_answer': user_answer,
+                    'correct_answer': correct_answer,
+                    'is_correct': bool(is_correct),
+                    'options': [],
+                }
+            if option is not None:
+                results[result_id]['options'].append(option)
+        return list(results.values())
+
+    # CSV of one quiz, generated from the store (options are written as a JSON list)
+    def export_csv(self, quiz_id: str) -> bytes:
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        for result in self.quiz_results(quiz_id):
+            writer.writerow({**result, 'options': json.dumps(result['options'], ensure_ascii=False)})
+        return output.getvalue().encode("utf-8")
+
+    # Load one of the old per-quiz CSV files into the store (topic and difficulty were not recorded)
+    def import_csv(self, path: str, topic: str = "unknown", difficulty: str = "unknown") -> str:
+        with open(path, newline="", encoding="utf-8") as f:
+            results = [
+                {
+                    **row,
+                    'question_number': int(row['question_number']),
+                    'is_correct': row['is_correct'] == "True",
+                    'options': ast.literal_eval(row['options']) if row.get('options') else [],
+                }
+                for row in csv.DictReader(f)
+            ]
+        return self.append(results, topic, difficulty, created_at=os.path.getmtime(path))
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+
+# Process-wide store shared by every quiz session
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_results_store() -> ResultsStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResultsStore()
+            # Write any buffered results when the process exits
+            atexit.register(_store.flush)
+        return _store
@@ -2,20 +2,24 @@
 Overall Purpose:
 ----------------
 This Streamlit-based module defines the `QuizManager` class to:
-- Dynamically generate quizzes using an LLM (via `QuestionGenerator`).
+- Dynamically generate quizzes using an LLM (via `QuestionGenerator`), one question at a time, concurrently or in batches,
+  optionally streaming each question to the UI as soon as it is ready.
 - Allow users to answer MCQ or Fill-in-the-Blank questions interactively.
 - Evaluate user answers and calculate correctness.
-- Display results and optionally save them as a CSV file.
+- Display results, store them in the results store and export them as a CSV file.
 
 Use Case:
 ---------
 Create an interactive quiz app that auto-generates questions using LLMs and tracks user performance.
 """
 
-import os
+from typing import TYPE_CHECKING
+
 import streamlit as st
-import pandas as pd
-from src.generator.question_generator import QuestionGenerator
+
+# The generator and results store pull in langchain and SQLite; they are only imported when used
+if TYPE_CHECKING:
+    from src.generator.question_generator import QuestionGenerator
 
 # -------------------------------
 # Helper function to rerun the app
@@ -29,45 +33,105 @@ def rerun():
 # ------------------------------------
 class QuizManager:
     def __init__(self):
-        # Store generated questions, user answers, and results
+        # Store generated questions, user answers (by question index), and results
         self.questions = []
-        self.user_answers = []
+        self.user_answers = {}
         self.results = []
+        self.summary = None  # Score summary, computed once on submit
+        self.csv_data = None  # CSV export of the results, built on first download
+
+        # What the current quiz is about, recorded with its results
+        self.topic = ""
+        self.difficulty = ""
+        self.quiz_id = None  # Set once the results are in the results store
 
     # -----------------------------
     # Generate quiz questions using LLM
     # -----------------------------
-    def generate_questions(self, generator: QuestionGenerator, topic: str, question_type: str, difficulty: str, num_questions: int):
+    def generate_questions(self, generator: "QuestionGenerator", topic: str, question_type: str, difficulty: str, num_questions: int, mode: str = None):
         # Clear any previous quiz data
-        self.questions = []
-        self.user_answers = []
-        self.results = []
+        self._start_quiz(topic, difficulty)
 
         try:
-            for _ in range(num_questions):
-                if question_type == "Multiple Choice":
-                    # Generate MCQ from LLM
-                    question = generator.generate_mcq(topic, difficulty.lower())
-                    self.questions.append({
-                        'type': 'MCQ',
-                        'question': question.question,
-                        'options': question.options,
-                        'correct_answer': question.correct_answer
-                    })
-                else:
-                    # Generate Fill-in-the-Blank from LLM
-                    question = generator.generate_fill_blank(topic, difficulty.lower())
-                    self.questions.append({
-                        'type': 'Fill in the Blank',
-                        'question': question.question,
-                        'correct_answer': question.answer
-                    })
+            # Generate all questions; failed questions come back as exceptions
+            generated = generator.generate_questions(question_type, topic, difficulty.lower(), num_questions, mode)
         except Exception as e:
             # Show error in Streamlit if generation fails
             st.error(f"Error generating questions: {e}")
             return False
 
-        return True  # Successfully generated all questions
+        # Keep every question that was generated and report the ones that failed
+        failures = [q for q in generated if isinstance(q, BaseException)]
+        for question in generated:
+            if not isinstance(question, BaseException):
+                self.questions.append(self._to_question_dict(question_type, question))
+
+        if not self.questions:
+            st.error(f"Error generating questions: {failures[0]}")
+            return False
+        if failures:
+            st.warning(f"Only {len(self.questions)} of {num_questions} questions could be generated: {failures[0]}")
+
+        return True  # Successfully generated the quiz
+
+    # ------------------------------------------------------
+    # Generate quiz questions and yield each one when ready
+    # ------------------------------------------------------
+    def iter_questions(self, generator: "QuestionGenerator", topic: str, question_type: str, difficulty: str, num_questions: int):
+        # Clear any previous quiz data
+        self._start_quiz(topic, difficulty)
+
+        received = {}
+        failures = []
+        try:
+            # Yield (index, question) as soon as each question is validated
+            for index, question in generator.iter_questions(question_type, topic, difficulty.lower(), num_questions):
+                if isinstance(question, BaseException):
+                    failures.append(question)
+                    continue
+                received[index] = self._to_question_dict(question_type, question)
+                yield index, received[index]
+        except Exception as e:
+            failures.append(e)
+
+        # Keep the questions in their original order once everything has arrived
+        self.questions = [received[index] for index in sorted(received)]
+
+        if not self.questions:
+            st.error(f"Error generating questions: {failures[0] if failures else 'no questions returned'}")
+        elif failures:
+            st.warning(f"Only {len(self.questions)} of {num_questions} questions could be generated: {failures[0]}")
+
+    # -----------------------------------
+    # Reset the state for a new quiz
+    # -----------------------------------
+    def _start_quiz(self, topic: str, difficulty: str):
+        self.questions = []
+        self.user_answers = {}
+        self.results = []
+        self.summary = None
+        self.csv_data = None
+        self.topic = topic
+        self.difficulty = difficulty
+        self.quiz_id = None
+
+    # -----------------------------------------------
+    # Convert a generated question into a quiz entry
+    # -----------------------------------------------
+    @staticmethod
+    def _to_question_dict(question_type: str, question):
+        if question_type == "Multiple Choice":
+            return {
+                'type': 'MCQ',
+                'question': question.question,
+                'options': question.options,
+                'correct_answer': question.correct_answer
+            }
+        return {
+            'type': 'Fill in the Blank',
+            'question': question.question,
+            'correct_answer': question.answer
+        }
 
     # -------------------------------------
     # Show questions and collect user input
@@ -83,23 +147,27 @@ class QuizManager:
                     q['options'],
                     key=f"mcq_{i}"
                 )
-                self.user_answers.append(user_answer)
             else:
                 # Show input box for Fill-in-the-Blank
                 user_answer = st.text_input(
                     f"Fill in the blank for Question {i + 1}",
                     key=f"fill_blank_{i}"
                 )
-                self.user_answers.append(user_answer)
+
+            # Keyed by question index, so reruns overwrite the answer instead of adding another one
+            self.user_answers[i] = user_answer
 
     # --------------------------------------------
     # Check user answers and store evaluation info
     # --------------------------------------------
     def evaluate_quiz(self):
         self.results = []
+        self.quiz_id = None
+        self.csv_data = None
 
         # Compare each user answer with the correct one
-        for i, (q, user_ans) in enumerate(zip(self.questions, self.user_answers)):
+        for i, q in enumerate(self.questions):
+            user_ans = self.user_answers.get(i) or ""
             result_dict = {
                 'question_number': i + 1,
                 'question': q['question'],
@@ -119,38 +187,58 @@ class QuizManager:
 
             self.results.append(result_dict)
 
+        # Score summary for the results page, so reruns don't recount it
+        correct = sum(1 for r in self.results if r['is_correct'])
+        total = len(self.results)
+        self.summary = {
+            'correct': correct,
+            'total': total,
+            'percentage': correct / total * 100 if total else 0.0,
+        }
+
     # -------------------------------
     # Convert results to a DataFrame
     # -------------------------------
     def generate_result_dataframe(self):
+        # pandas is only needed for exports, so it is not imported with the app
+        import pandas as pd
+
         if not self.results:
             return pd.DataFrame()  # Return empty DataFrame if no results
         return pd.DataFrame(self.results)
 
-    # -------------------------------
-    # Save results to a CSV file
-    # -------------------------------
-    def save_to_csv(self, filename_prefix='quiz_results'):
+    # ------------------------------------------
+    # Append the results to the results store
+    # ------------------------------------------
+    def save_results(self):
+        if not self.results:
+            return None
+        if self.quiz_id is None:
+            from src.storage.results_store import get_results_store
+            try:
+                self.quiz_id = get_results_store().append(self.results, self.topic, self.difficulty)
+            except Exception as e:
+                st.error(f"Failed to save results: {e}")
+        return self.quiz_id
+
+    # ---------------------------------------------
+    # Build the CSV of this quiz from the store
+    # ---------------------------------------------
+    def export_csv(self):
         if not self.results:
             st.warning("No results to save. Please complete the quiz first.")
             return None
 
-        df = self.generate_result_dataframe()
-
-        # Create a timestamped filename
-        from datetime import datetime
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        unique_filename = f"{filename_prefix}_{timestamp}.csv"
-
-        # Make sure the results directory exists
-        os.makedirs('results', exist_ok=True)
-        full_path = os.path.join('results', unique_filename)
+        if self.csv_data is not None:
+            return self.csv_data
 
+        quiz_id = self.save_results()
+        if quiz_id is None:
+            return None
+        from src.storage.results_store import get_results_store
         try:
-            # Save the results as CSV
-            df.to_csv(full_path, index=False)
-            st.success(f"Results saved to {full_path}")
-            return full_path
+            self.csv_data = get_results_store().export_csv(quiz_id)
+            return self.csv_data
         except Exception as e:
-            st.error(f"Failed to save results: {e}")
+            st.error(f"Failed to export results: {e}")
             return None
@@ -0,0 +1,34 @@
+import json
+
+from src.cli import load_jobs
+from src.generator.question_generator import QUESTION_TYPE_MCQ, QUESTION_TYPE_FILL_BLANK
+
+
+def write_jobs(path, rows):
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+    return str(path)
+
+
+def test_default_job_ids_survive_inserted_lines(tmp_path):
+    jobs = [
+        {"topic": "Indian History", "difficulty": "Medium", "type": "mcq", "count": 5},
+        {"topic": "Physics", "type": "fill_blank", "count": 3},
+        {"topic": "indian  history", "difficulty": "medium", "type": "mcq", "count": 2},
+    ]
+    before = [job["id"] for job in load_jobs(write_jobs(tmp_path / "before.jsonl", jobs))]
+    edited = [{"topic": "Chemistry", "count": 1}] + jobs[:1] + [{"topic": "Biology", "count": 1}] + jobs[1:]
+    after = {job["topic"]: job["id"] for job in load_jobs(write_jobs(tmp_path / "after.jsonl", edited))}
+
+    assert before == [
+        f"indian history|medium|{QUESTION_TYPE_MCQ}#1",
+        f"physics|medium|{QUESTION_TYPE_FILL_BLANK}#1",
+        f"indian history|medium|{QUESTION_TYPE_MCQ}#2",
+    ]
+    assert after["Indian History"] == before[0]
+    assert after["Physics"] == before[1]
+    assert after["indian  history"] == before[2]
+
+
+def test_explicit_job_id_is_kept(tmp_path):
+    jobs = load_jobs(write_jobs(tmp_path / "jobs.jsonl", [{"id": "history-batch", "topic": "History"}]))
+    assert jobs[0]["id"] == "history-batch"
@@ -0,0 +1,186 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.generator.coalescing import CoalescingQuestionGenerator, COALESCED
+
+MCQ = "Multiple Choice"
+
+
+class FakeGenerator:
+    def __init__(self, error: Exception = None):
+        self.error = error
+        self.calls = []  # (api, count, mode)
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def generate_questions(self, question_type, topic, difficulty, count, mode=None):
+        self.calls.append(("generate", count, mode))
+        self.started.set()
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return [f"{mode} question {i}" for i in range(count)]
+
+    def iter_questions(self, question_type, topic, difficulty, count):
+        self.calls.append(("iter", count, None))
+        for index in range(count):
+            yield index, f"streamed question {index}"
+
+
+class FakeAsyncGenerator:
+    def __init__(self):
+        self.calls = 0
+        self.cancelled = False
+        self.release = asyncio.Event()
+
+    async def agenerate_questions(self, question_type, topic, difficulty, count):
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return [f"question {i}" for i in range(count)]
+
+
+def in_thread(call):
+    outcome = {}
+
+    def run():
+        try:
+            outcome["result"] = call()
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread, outcome
+
+
+# Wait until one more request has joined an in-flight generation
+def wait_for_follower(api: str, before: float):
+    deadline = time.monotonic() + 5
+    while COALESCED.value(api=api) <= before:
+        assert time.monotonic() < deadline, "the follower never joined"
+        time.sleep(0.01)
+
+
+def test_follower_receives_the_leaders_questions():
+    generator = FakeGenerator()
+    coalescing = CoalescingQuestionGenerator(generator, shuffle_options=False)
+    joined = COALESCED.value(api="generate")
+
+    leader, leader_outcome = in_thread(lambda: coalescing.generate_questions(MCQ, "Space", "easy", 3, "batch"))
+    generator.started.wait(5)
+    follower, follower_outcome = in_thread(lambda: coalescing.generate_questions(MCQ, " space ", "Easy", 3, "batch"))
+    wait_for_follower("generate", joined)
+    generator.release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert generator.calls == [("generate", 3, "batch")]
+    assert follower_outcome["result"] == leader_outcome["result"] == ["batch question 0", "batch question 1", "batch question 2"]
+
+
+def test_leader_error_reaches_the_follower():
+    generator = FakeGenerator(error=RuntimeError("LLM unavailable"))
+    coalescing = CoalescingQuestionGenerator(generator, shuffle_options=False)
+    joined = COALESCED.value(api="generate")
+
+    leader, _ = in_thread(lambda: coalescing.generate_questions(MCQ, "Space", "easy", 2, "batch"))
+    generator.started.wait(5)
+    follower, follower_outcome = in_thread(lambda: coalescing.generate_questions(MCQ, "Space", "easy", 2, "batch"))
+    wait_for_follower("generate", joined)
+    generator.release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert str(follower_outcome["error"]) == "LLM unavailable"
+    assert len(generator.calls) == 1
+
+
+def test_callers_with_different_modes_are_not_merged():
+    generator = FakeGenerator()
+    coalescing = CoalescingQuestionGenerator(generator, shuffle_options=False)
+
+    leader, _ = in_thread(lambda: coalescing.generate_questions(MCQ, "Space", "easy", 2, "batch"))
+    generator.started.wait(5)
+    other, other_outcome = in_thread(lambda: coalescing.generate_questions(MCQ, "Space", "easy", 2, "sequential"))
+    generator.release.set()
+    leader.join(5)
+    other.join(5)
+
+    assert sorted(mode for _, _, mode in generator.calls) == ["batch", "sequential"]
+    assert other_outcome["result"] == ["sequential question 0", "sequential question 1"]
+
+
+def test_followers_fill_the_slots_of_a_leader_closed_early():
+    generator = FakeGenerator()
+    coalescing = CoalescingQuestionGenerator(generator, shuffle_options=False)
+    joined = COALESCED.value(api="iter")
+
+    stream = coalescing.iter_questions(MCQ, "Space", "easy", 3)
+    assert next(stream) == (0, "streamed question 0")
+    follower, outcome = in_thread(lambda: list(coalescing.iter_questions(MCQ, "Space", "easy", 3)))
+    wait_for_follower("iter", joined)
+    stream.close()
+    follower.join(5)
+
+    assert sorted(index for index, _ in outcome["result"]) == [0, 1, 2]
+    # The follower only generated the two questions the leader never delivered
+    assert generator.calls == [("iter", 3, None), ("iter", 2, None)]
+
+
+def test_follower_stops_waiting_for_a_stalled_leader():
+    generator = FakeGenerator()
+    coalescing = CoalescingQuestionGenerator(generator, shuffle_options=False, wait_seconds=0.2)
+
+    stream = coalescing.iter_questions(MCQ, "Space", "easy", 3)
+    next(stream)  # The leader's consumer stops reading without closing the stream
+    follower, outcome = in_thread(lambda: list(coalescing.iter_questions(MCQ, "Space", "easy", 3)))
+    follower.join(5)
+
+    assert not follower.is_alive()
+    assert sorted(index for index, _ in outcome["result"]) == [0, 1, 2]
+    stream.close()
+
+
+def test_cancelling_one_async_waiter_keeps_the_shared_generation():
+    async def scenario():
+        generator = FakeAsyncGenerator()
+        coalescing = CoalescingQuestionGenerator(generator, shuffle_options=False)
+        first = asyncio.ensure_future(coalescing.agenerate_questions(MCQ, "Space", "easy", 2))
+        second = asyncio.ensure_future(coalescing.agenerate_questions(MCQ, "Space", "easy", 2))
+        await asyncio.sleep(0.01)
+
+        first.cancel()
+        await asyncio.sleep(0.01)
+        generator.release.set()
+
+        assert await second == ["question 0", "question 1"]
+        assert first.cancelled()
+        assert generator.calls == 1 and not generator.cancelled
+
+    asyncio.run(scenario())
+
+
+def test_cancelling_every_async_waiter_cancels_the_generation():
+    async def scenario():
+        generator = FakeAsyncGenerator()
+        coalescing = CoalescingQuestionGenerator(generator, shuffle_options=False)
+        waiters = [asyncio.ensure_future(coalescing.agenerate_questions(MCQ, "Space", "easy", 2)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+
+        for waiter in waiters:
+            waiter.cancel()
+        for waiter in waiters:
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+        await asyncio.sleep(0.01)
+
+        assert generator.cancelled
+
+    asyncio.run(scenario())
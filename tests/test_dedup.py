@@ -0,0 +1,61 @@
+from src.generator.dedup import DedupQuestionGenerator
+
+QUESTION = {"question": "Which planet is known as the red planet?", "correct_answer": "Mars"}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeBank:
+    ttl_seconds = 3600
+
+    def __init__(self, questions):
+        self.contents = list(questions)
+        self.loads = []
+
+    def questions(self, question_type, topic, difficulty):
+        self.loads.append(topic)
+        return list(self.contents)
+
+
+class RepeatingGenerator:
+    def generate_questions(self, question_type, topic, difficulty, count, mode=None):
+        return [dict(QUESTION) for _ in range(count)]
+
+
+def make_dedup(bank, clock, **kwargs):
+    return DedupQuestionGenerator(RepeatingGenerator(), bank=bank, max_rounds=0, clock=clock, **kwargs)
+
+
+def test_bank_index_forgets_questions_dropped_from_the_cache():
+    bank, clock = FakeBank([QUESTION]), FakeClock()
+    dedup = make_dedup(bank, clock, bank_refresh_seconds=60)
+
+    assert isinstance(dedup.generate_questions("Multiple Choice", "Space", "easy", 1)[0], Exception)
+
+    bank.contents = []  # Expired from the cache
+    clock.now = 61
+    assert dedup.generate_questions("Multiple Choice", "Space", "easy", 1) == [QUESTION]
+    assert bank.loads == ["Space", "Space"]
+
+
+def test_refresh_never_outlasts_the_cache_ttl():
+    bank = FakeBank([])
+    bank.ttl_seconds = 30
+    assert make_dedup(bank, FakeClock(), bank_refresh_seconds=600).bank_refresh_seconds == 30
+
+
+def test_bank_indexes_are_bounded():
+    bank, clock = FakeBank([]), FakeClock()
+    dedup = make_dedup(bank, clock, max_bank_keys=2)
+    for topic in ["Space", "Rivers", "Space", "Volcanoes", "Space"]:
+        dedup.generate_questions("Multiple Choice", topic, "easy", 1)
+
+    assert len(dedup._bank_indexes) == 2
+    # "Space" stayed in use, so it was never reloaded; "Rivers" was evicted
+    assert bank.loads == ["Space", "Rivers", "Volcanoes"]
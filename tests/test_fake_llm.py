@@ -0,0 +1,10 @@
+from src.llm.fake_llm import _DIFFICULTY_RE
+from src.prompts.templates import PROMPT_VARIANTS
+from src.prompts.token_counter import prompt_text
+
+
+def test_difficulty_is_read_from_every_prompt():
+    for prompts in PROMPT_VARIANTS.values():
+        for template in (prompts.mcq, prompts.fill_blank, prompts.mcq_batch, prompts.fill_blank_batch):
+            text = prompt_text(prompts.render(template, topic="Physics", difficulty="hard", count=3))
+            assert _DIFFICULTY_RE.search(text).group(1) == "hard"
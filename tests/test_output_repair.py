@@ -0,0 +1,25 @@
+import pytest
+
+from src.generator.output_repair import repair_mcq
+
+
+def mcq(answer, options):
+    return repair_mcq({"question": "?", "options": options, "correct_answer": answer})["correct_answer"]
+
+
+@pytest.mark.parametrize("answer, options, expected", [
+    ("Mixx the solution", ["Mix the solution", "Boil the solution", "Freeze it", "Filter it"], "Mix the solution"),
+    ("i beleive in science", ["I believe in science", "Nothing", "Something else", "Other"], "I believe in science"),
+    ("Photosynthesiss", ["Photosynthesis", "Respiration", "Digestion", "Osmosis"], "Photosynthesis"),
+])
+def test_typos_in_words_spelled_with_roman_letters_are_fixed(answer, options, expected):
+    assert mcq(answer, options) == expected
+
+
+@pytest.mark.parametrize("answer, options", [
+    ("Louis XV", ["Louis XIV", "Louis XVI", "Napoleon", "Henry IV"]),
+    ("World War 2", ["World War II", "World War I", "Cold War", "Korean War"]),
+    ("Apollo 12", ["Apollo 11", "Gemini 4", "Vostok 1", "Mercury 7"]),
+])
+def test_answers_with_other_numbers_are_not_matched(answer, options):
+    assert mcq(answer, options) == answer
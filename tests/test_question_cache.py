@@ -0,0 +1,13 @@
+from src.cache.question_cache import make_cache_key
+from src.config.settings import settings
+
+
+def test_cache_key_includes_the_routed_backends(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_BACKENDS", [])
+    single = make_cache_key("Multiple Choice", "Physics", "Easy")
+    monkeypatch.setattr(settings, "LLM_BACKENDS", ["groq:llama-3.1-8b-instant", "groq:llama-3.3-70b-versatile"])
+    routed = make_cache_key("Multiple Choice", "Physics", "Easy")
+
+    assert settings.MODEL_NAME in single
+    assert "groq:llama-3.3-70b-versatile" in routed
+    assert routed != single
@@ -0,0 +1,34 @@
+import threading
+import time
+
+from src.generator.question_generator import QuestionGenerator, QUESTION_TYPE_MCQ
+from src.llm.fake_llm import FakeChatModel
+from src.llm.rate_limiter import RateLimiter
+
+
+class SlowAfterFirstLLM:
+    """Answers the first call at once and holds every later call for `delay` seconds."""
+
+    def __init__(self, delay: float):
+        self.llm = FakeChatModel(latency_ms=0, seed=1)
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, prompt, **kwargs):
+        with self._lock:
+            self.calls += 1
+            slow = self.calls > 1
+        if slow:
+            time.sleep(self.delay)
+        return self.llm.invoke(prompt, **kwargs)
+
+
+def test_closing_the_stream_does_not_wait_for_running_calls():
+    generator = QuestionGenerator(llm=SlowAfterFirstLLM(delay=1.0), rate_limiter=RateLimiter(0, 0))
+    stream = generator.iter_questions(QUESTION_TYPE_MCQ, "Space", "easy", 4)
+    next(stream)
+
+    start = time.perf_counter()
+    stream.close()
+    assert time.perf_counter() - start < 0.5
@@ -0,0 +1,189 @@
+import asyncio
+import time
+
+import pytest
+
+from src.llm.rate_limiter import RateLimiter
+from src.llm.router import Backend, ModelRouter, ROUTER_HEDGES, ROUTER_HEDGES_SKIPPED
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+class FakeBackendLLM:
+    def __init__(self, name: str, delay: float = 0.0, fail: bool = False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = 0
+
+    def invoke(self, prompt, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.name} is down")
+        return self.name
+
+    async def ainvoke(self, prompt, **kwargs):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise RuntimeError(f"{self.name} is down")
+        return self.name
+
+
+class CountingRateLimiter(RateLimiter):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.acquired = 0
+
+    def acquire(self, tokens: int = 0):
+        self.acquired += 1
+        super().acquire(tokens)
+
+    async def aacquire(self, tokens: int = 0):
+        self.acquired += 1
+        await super().aacquire(tokens)
+
+
+def make_router(*llms, clock=None, rate_limiter=None, **options):
+    options = {"hedge": False, "failure_threshold": 2, "cooldown_seconds": 30.0, "error_window_seconds": 60.0, **options}
+    return ModelRouter(
+        [Backend(llm.name, llm) for llm in llms],
+        rate_limiter=rate_limiter or RateLimiter(0, 0),
+        clock=clock or FakeClock(),
+        **options,
+    )
+
+
+def test_fails_over_to_the_next_backend_through_the_rate_limiter():
+    primary, secondary = FakeBackendLLM("primary", fail=True), FakeBackendLLM("secondary")
+    limiter = CountingRateLimiter(0, 0)
+    router = make_router(primary, secondary, rate_limiter=limiter)
+
+    assert router.invoke("prompt") == "secondary"
+    assert (primary.calls, secondary.calls) == (1, 1)
+    assert limiter.acquired == 1  # only the failover; the first call is reserved by the caller
+
+
+def test_raises_the_last_error_when_every_backend_fails():
+    router = make_router(FakeBackendLLM("a", fail=True), FakeBackendLLM("b", fail=True))
+
+    with pytest.raises(RuntimeError, match="b is down"):
+        router.invoke("prompt")
+
+
+def test_circuit_opens_probes_after_cooldown_and_closes_on_success():
+    clock = FakeClock()
+    # "steady" is slower, so a healthy "flaky" ranks first again once it recovers
+    flaky, steady = FakeBackendLLM("flaky", fail=True), FakeBackendLLM("steady", delay=0.01)
+    # Error rate never demotes it here, so only the circuit decides whether it gets traffic
+    router = make_router(flaky, steady, clock=clock, max_error_rate=1.0)
+
+    for _ in range(2):
+        assert router.invoke("prompt") == "steady"
+    assert router.stats()[0]["circuit_open"]
+
+    # Open circuit: no traffic during the cooldown
+    router.invoke("prompt")
+    assert flaky.calls == 2
+
+    # After the cooldown one request probes it; a failed probe re-opens the circuit
+    clock.advance(31)
+    assert router.invoke("prompt") == "steady"
+    assert flaky.calls == 3
+    router.invoke("prompt")
+    assert flaky.calls == 3
+    assert router.stats()[0]["circuit_open"]
+
+    # A successful probe closes the circuit and the backend is no longer treated as degraded
+    flaky.fail = False
+    clock.advance(31)
+    assert router.invoke("prompt") == "flaky"
+    stats = router.stats()[0]
+    assert not stats["circuit_open"] and not stats["half_open"]
+    assert stats["error_rate"] == 0.0
+    assert router._ranked()[0].name == "flaky"
+
+
+def test_degraded_backend_recovers_once_its_errors_age_out():
+    clock = FakeClock()
+    flaky, steady = FakeBackendLLM("flaky", fail=True), FakeBackendLLM("steady")
+    router = make_router(flaky, steady, clock=clock, failure_threshold=5)
+
+    router.invoke("prompt")
+    flaky.fail = False
+    assert [b.name for b in router._ranked()] == ["steady", "flaky"]
+
+    clock.advance(61)
+    assert router._ranked()[0].name == "flaky"
+    assert router.invoke("prompt") == "flaky"
+
+
+def test_hedges_a_slow_backend_and_takes_the_first_answer():
+    slow, fast = FakeBackendLLM("slow", delay=0.5), FakeBackendLLM("fast")
+    router = make_router(slow, fast, hedge=True, hedge_default_delay=0.05)
+    hedges = ROUTER_HEDGES.value(backend="slow")
+
+    start = time.perf_counter()
+    assert router.invoke("prompt") == "fast"
+    assert time.perf_counter() - start < 0.4
+    assert ROUTER_HEDGES.value(backend="slow") == hedges + 1
+
+
+def test_skips_the_hedge_when_the_rate_limit_budget_is_used_up():
+    slow, fast = FakeBackendLLM("slow", delay=0.2), FakeBackendLLM("fast")
+    limiter = RateLimiter(1, 0)
+    limiter.acquire()  # the caller's reservation for this request uses the whole budget
+    router = make_router(slow, fast, hedge=True, hedge_default_delay=0.05, rate_limiter=limiter)
+    skipped = ROUTER_HEDGES_SKIPPED.value(backend="slow")
+
+    assert router.invoke("prompt") == "slow"
+    assert fast.calls == 0
+    assert ROUTER_HEDGES_SKIPPED.value(backend="slow") == skipped + 1
+
+
+def test_async_hedge_cancels_the_losing_call():
+    slow, fast = FakeBackendLLM("slow", delay=1.0), FakeBackendLLM("fast")
+    router = make_router(slow, fast, hedge=True, hedge_default_delay=0.05)
+
+    async def run():
+        result = await router.ainvoke("prompt")
+        await asyncio.sleep(0)  # let the cancellation reach the losing call
+        return result
+
+    assert asyncio.run(run()) == "fast"
+    assert slow.cancelled == 1
+
+
+def test_cancelled_probe_lets_the_next_request_probe_again():
+    clock = FakeClock()
+    flaky, steady = FakeBackendLLM("flaky", fail=True), FakeBackendLLM("steady")
+    router = make_router(flaky, steady, clock=clock, failure_threshold=1)
+    router.invoke("prompt")
+    clock.advance(31)
+    flaky.fail, flaky.delay = False, 1.0
+
+    async def cancel_probe():
+        task = asyncio.ensure_future(router.ainvoke("prompt"))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_probe())
+    flaky.delay = 0.0
+    assert router.invoke("prompt") == "flaky"